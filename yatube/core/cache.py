@@ -0,0 +1,236 @@
+import os
+import pickle
+import sqlite3
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from . import timing
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISSING = 'missing'
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+    'CREATE TABLE IF NOT EXISTS cache_lock ('
+    'key TEXT PRIMARY KEY, until REAL NOT NULL)',
+)
+
+
+class SQLiteCache(BaseCache):
+    """Кеш в файле SQLite, общий для всех воркеров на одном хосте.
+
+    Просроченная запись ещё STALE_TIMEOUT секунд отдаётся читателям, пока
+    один из них, взявший блокировку ключа, пересчитывает значение.
+    get_or_set() при полном промахе тоже пересчитывает значение в одном
+    воркере, остальные ждут его до WAIT_TIMEOUT секунд.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._stale_timeout = options.get('STALE_TIMEOUT', 60)
+        self._lock_timeout = options.get('LOCK_TIMEOUT', 30)
+        self._wait_timeout = options.get('WAIT_TIMEOUT', 5)
+        self._poll_interval = options.get('POLL_INTERVAL', 0.05)
+        self._connection = None
+        self._pid = None
+
+    @property
+    def _db(self):
+        # После fork соединение родителя использовать нельзя.
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=self._lock_timeout, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _lookup(self, key):
+        row = self._db.execute(
+            'SELECT value, expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return MISSING, None
+        value, expires = row
+        now = time.time()
+        if expires is None or expires > now:
+            return FRESH, pickle.loads(value)
+        if expires + self._stale_timeout > now:
+            return STALE, pickle.loads(value)
+        return MISSING, None
+
+    def _acquire(self, key):
+        now = time.time()
+        cursor = self._db.execute(
+            'INSERT INTO cache_lock (key, until) VALUES (?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET until = excluded.until '
+            'WHERE cache_lock.until <= ?',
+            (key, now + self._lock_timeout, now)
+        )
+        return cursor.rowcount == 1
+
+    def _release(self, key):
+        self._db.execute('DELETE FROM cache_lock WHERE key = ?', (key,))
+
+    def _write(self, key, value, timeout):
+        expires = self.get_backend_timeout(timeout)
+        if expires is not None and expires <= time.time():
+            self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+            self._release(key)
+            return
+        self._db.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) '
+            'VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+        )
+        self._release(key)
+        self._cull()
+
+    def _cull(self):
+        db = self._db
+        count, = db.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count <= self._max_entries:
+            return
+        db.execute(
+            'DELETE FROM cache WHERE expires < ?',
+            (time.time() - self._stale_timeout,)
+        )
+        count, = db.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count > self._max_entries and self._cull_frequency:
+            db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency,)
+            )
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        state, value = self._lookup(key)
+        if state == FRESH:
+            timing.cache_lookup(True)
+            return value
+        if state == STALE and not self._acquire(key):
+            # Значение уже пересчитывает другой воркер.
+            timing.cache_lookup(True)
+            return value
+        timing.cache_lookup(False)
+        return default
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT,
+                   version=None):
+        key = self._key(key, version)
+        state, value = self._lookup(key)
+        timing.cache_lookup(state == FRESH)
+        if state == FRESH:
+            return value
+        if not self._acquire(key):
+            if state == STALE:
+                return value
+            value = self._wait(key)
+            if value is not None:
+                return value
+        try:
+            value = default() if callable(default) else default
+        except BaseException:
+            self._release(key)
+            raise
+        if value is None:
+            self._release(key)
+            return None
+        self._write(key, value, timeout)
+        return value
+
+    def _wait(self, key):
+        deadline = time.monotonic() + self._wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self._poll_interval)
+            state, value = self._lookup(key)
+            if state == FRESH:
+                return value
+            if self._acquire(key):
+                return None
+        return None
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        cursor = self._db.execute(
+            'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'value = excluded.value, expires = excluded.expires '
+            'WHERE cache.expires <= ?',
+            (
+                key,
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                self.get_backend_timeout(timeout),
+                time.time(),
+            )
+        )
+        if cursor.rowcount != 1:
+            return False
+        self._release(key)
+        self._cull()
+        return True
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write(self._key(key, version), value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ?',
+            (self.get_backend_timeout(timeout), self._key(key, version))
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            state, value = self._lookup(key)
+            if state != FRESH:
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key)
+            )
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+        return value
+
+    def has_key(self, key, version=None):
+        return self._lookup(self._key(key, version))[0] == FRESH
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        cursor = self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+        self._release(key)
+        return cursor.rowcount == 1
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+        self._db.execute('DELETE FROM cache_lock')
+
+    def close(self, **kwargs):
+        # Соединение живёт между запросами: открывать файл на каждый
+        # запрос дороже, чем держать его открытым.
+        pass
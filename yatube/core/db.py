@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def sqlite_configured(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite.
+
+    Большинство настроек действует только в рамках соединения, поэтому
+    их нужно повторять при каждом подключении.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,264 @@
+import fcntl
+import gc
+import json
+import os
+import resource
+import threading
+import time
+
+from django.conf import settings
+
+from . import timing
+
+_counters = {}
+_collectors = {}
+_lock = threading.Lock()
+_flushed = 0.0
+_process = None
+
+# Сумма метрик завершившихся воркеров.
+ARCHIVE = 'archive.json'
+
+
+def inc(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def register(name, collector):
+    """Счётчик, значение которого берётся вызовом collector()."""
+    _collectors[name] = collector
+
+
+def _rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Без /proc берём пиковое значение, в килобайтах на Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _process_id():
+    """(pid, метка запуска): pid завершившегося воркера может
+    достаться новому процессу, и его снимок не должен затереть старый.
+    """
+    global _process
+    pid = os.getpid()
+    if _process is None or _process[0] != pid:
+        _process = (pid, time.time_ns())
+    return _process
+
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+    for name, collector in _collectors.items():
+        counters[name] = collector()
+    pid, started = _process_id()
+    return {
+        'pid': pid,
+        'started': started,
+        'views': timing.histograms(),
+        'counters': counters,
+        'process': {
+            'rss_bytes': _rss(),
+            'gc_pending': list(gc.get_count()),
+            'gc_collections': [
+                stats['collections'] for stats in gc.get_stats()
+            ],
+        },
+    }
+
+
+def _path(name):
+    return os.path.join(settings.METRICS_DIR, name)
+
+
+def _write(name, data):
+    path = _path(name)
+    temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def _read(name):
+    try:
+        with open(_path(name)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def flush(force=False):
+    """Сбрасывает снимок процесса в общий каталог, не чаще интервала."""
+    global _flushed
+    now = time.monotonic()
+    if not force and now - _flushed < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _flushed = now
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    _write('{}-{}.json'.format(*_process_id()), snapshot())
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _partition(snapshots):
+    """Имена снимков живых и завершившихся воркеров."""
+    # Из снимков с одним pid жив может быть только последний.
+    latest = {}
+    for data in snapshots.values():
+        latest[data['pid']] = max(
+            latest.get(data['pid'], 0), data.get('started', 0)
+        )
+    alive, dead = [], []
+    for name, data in snapshots.items():
+        if (
+            data.get('started', 0) == latest[data['pid']]
+            and _alive(data['pid'])
+        ):
+            alive.append(name)
+        else:
+            dead.append(name)
+    return alive, dead
+
+
+def _snapshots():
+    """Снимки живых воркеров хоста и архив завершившихся.
+
+    Снимки завершившихся воркеров складываются в ARCHIVE и удаляются,
+    поэтому каталог не растёт с каждым перезапуском. Блокировка не
+    даёт двум запросам /metrics сложить один снимок дважды.
+    """
+    flush(force=True)
+    with open(_path('.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        snapshots = {}
+        for name in os.listdir(settings.METRICS_DIR):
+            if name.endswith('.json') and name != ARCHIVE:
+                data = _read(name)
+                if data is not None:
+                    snapshots[name] = data
+        alive, dead = _partition(snapshots)
+        archive = _read(ARCHIVE) or {'views': {}, 'counters': {}}
+        if dead:
+            views, counters = _aggregate(
+                [archive] + [snapshots[name] for name in dead]
+            )
+            archive = {'views': views, 'counters': counters}
+            _write(ARCHIVE, archive)
+            for name in dead:
+                os.remove(_path(name))
+    return [snapshots[name] for name in alive], archive
+
+
+def _labels(**labels):
+    return '{%s}' % ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for name, value in labels.items()
+    )
+
+
+def _aggregate(snapshots):
+    views, counters = {}, {}
+    for snapshot in snapshots:
+        for name, histogram in snapshot['views'].items():
+            total = views.setdefault(name, {
+                'buckets': [0] * len(timing.BUCKETS),
+                'count': 0,
+                'sum': 0.0,
+                'sql_count': 0,
+                'cache_hits': 0,
+                'cache_misses': 0,
+            })
+            for index, value in enumerate(histogram['buckets']):
+                total['buckets'][index] += value
+            for key in ('count', 'sum', 'sql_count',
+                        'cache_hits', 'cache_misses'):
+                total[key] += histogram[key]
+        for name, value in snapshot['counters'].items():
+            counters[name] = counters.get(name, 0) + value
+    return views, counters
+
+
+def render():
+    """Метрики всех воркеров в текстовом формате Prometheus.
+
+    Счётчики суммируются по всем снимкам, включая архив завершившихся
+    воркеров; память и сборщик мусора — только у живых процессов.
+    """
+    snapshots, archive = _snapshots()
+    views, counters = _aggregate([archive] + snapshots)
+    lines = [
+        '# HELP yatube_request_duration_seconds Время ответа по имени URL.',
+        '# TYPE yatube_request_duration_seconds histogram',
+    ]
+    for name, histogram in sorted(views.items()):
+        for bound, value in zip(timing.BUCKETS, histogram['buckets']):
+            lines.append('yatube_request_duration_seconds_bucket{} {}'.format(
+                _labels(view=name, le=bound), value
+            ))
+        lines.append('yatube_request_duration_seconds_bucket{} {}'.format(
+            _labels(view=name, le='+Inf'), histogram['count']
+        ))
+        lines.append('yatube_request_duration_seconds_sum{} {}'.format(
+            _labels(view=name), histogram['sum']
+        ))
+        lines.append('yatube_request_duration_seconds_count{} {}'.format(
+            _labels(view=name), histogram['count']
+        ))
+    per_view = (
+        ('db_queries_total', 'counter', 'SQL-запросы по имени URL.',
+         lambda histogram: histogram['sql_count']),
+        ('cache_hits_total', 'counter', 'Попадания в кеш по имени URL.',
+         lambda histogram: histogram['cache_hits']),
+        ('cache_misses_total', 'counter', 'Промахи кеша по имени URL.',
+         lambda histogram: histogram['cache_misses']),
+        ('cache_hit_ratio', 'gauge', 'Доля попаданий в кеш по имени URL.',
+         lambda histogram: histogram['cache_hits'] / (
+             histogram['cache_hits'] + histogram['cache_misses']
+         ) if histogram['cache_hits'] + histogram['cache_misses'] else 0),
+    )
+    for metric, kind, description, value in per_view:
+        lines.append(f'# HELP yatube_{metric} {description}')
+        lines.append(f'# TYPE yatube_{metric} {kind}')
+        for name, histogram in sorted(views.items()):
+            lines.append('yatube_{}{} {}'.format(
+                metric, _labels(view=name), value(histogram)
+            ))
+    for name, value in sorted(counters.items()):
+        lines.append(f'# TYPE yatube_{name}_total counter')
+        lines.append(f'yatube_{name}_total {value}')
+    lines += [
+        '# TYPE yatube_process_resident_memory_bytes gauge',
+        '# TYPE yatube_process_gc_pending gauge',
+        '# TYPE yatube_process_gc_collections_total counter',
+    ]
+    for snapshot in snapshots:
+        pid = snapshot['pid']
+        process = snapshot['process']
+        lines.append('yatube_process_resident_memory_bytes{} {}'.format(
+            _labels(pid=pid), process['rss_bytes']
+        ))
+        for generation, value in enumerate(process['gc_pending']):
+            lines.append('yatube_process_gc_pending{} {}'.format(
+                _labels(pid=pid, generation=generation), value
+            ))
+        for generation, value in enumerate(process['gc_collections']):
+            lines.append('yatube_process_gc_collections_total{} {}'.format(
+                _labels(pid=pid, generation=generation), value
+            ))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,75 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, routers, timing
+
+
+class ServerTimingMiddleware:
+    """Замеряет запрос и отдаёт замеры в заголовке Server-Timing.
+
+    Время SQL, шаблонов и попадания в кеш собираются в объект текущего
+    запроса, итог попадает в гистограмму по имени view, которую
+    воркер время от времени сбрасывает для /metrics. При
+    SERVER_TIMING = False middleware не подключается вовсе.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        timing.instrument_templates()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        current, token = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.sql)
+                    )
+                response = self.get_response(request)
+        finally:
+            timing.stop(token)
+        current.finish()
+        response['Server-Timing'] = current.header()
+        match = getattr(request, 'resolver_match', None)
+        timing.observe(match.view_name if match else 'unresolved', current)
+        metrics.flush()
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет пользователя за основной базой после записи.
+
+    Пока жива кука READ_REPLICA_PIN_COOKIE, view с @read_replica читают
+    из основной базы: реплика могла ещё не получить изменения. Окно
+    отставания для остальных читателей отсчитывается заново от
+    завершения пишущего запроса, когда изменения уже закоммичены.
+    """
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state, token = routers.start(
+            settings.READ_REPLICA_PIN_COOKIE in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.stop(token)
+        if state.wrote:
+            routers.mark_write()
+            response.set_cookie(
+                settings.READ_REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.READ_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,100 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+RECENT_WRITE_KEY = 'replica_recent_write'
+
+_state = ContextVar('replica_state', default=None)
+
+
+class RequestState:
+    """Маршрутизация текущего запроса."""
+
+    def __init__(self, pinned):
+        # Пользователь недавно писал и читает только из основной базы.
+        self.pinned = pinned
+        self.reading = False
+        self.wrote = False
+
+
+def start(pinned):
+    state = RequestState(pinned)
+    return state, _state.set(state)
+
+
+def stop(token):
+    _state.reset(token)
+
+
+def mark_write():
+    """Отправляет всех читателей в основную базу, пока реплика догоняет.
+
+    Запись сдвигает версии лент, тегов и счётчиков. Страница, счётчик
+    или ETag, собранные по отстающей реплике, легли бы в кеш уже под
+    новой версией и не сбросились бы до следующей записи.
+    """
+    cache.set(RECENT_WRITE_KEY, True, settings.READ_REPLICA_PIN_SECONDS)
+
+
+def replica_lagging():
+    return cache.get(RECENT_WRITE_KEY) is not None
+
+
+def read_replica(view):
+    """Читает модели READ_REPLICA_APPS во view из реплики.
+
+    Закреплённые за основной базой пользователи, запросы вне
+    ReplicaPinMiddleware и все запросы в течение
+    READ_REPLICA_PIN_SECONDS после любой записи читают, как обычно,
+    из основной базы.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _state.get()
+        if state is None or state.pinned or replica_lagging():
+            return view(request, *args, **kwargs)
+        state.reading = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            state.reading = False
+    return wrapper
+
+
+class ReplicaRouter:
+    """Чтение лент из реплики READ_REPLICA, запись — в основную базу.
+
+    Внутри транзакции чтение тоже идёт в основную базу, иначе запрос
+    не увидит собственных изменений.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is None
+            or not state.reading
+            or not settings.READ_REPLICA
+            or model._meta.app_label not in settings.READ_REPLICA_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        return settings.READ_REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if settings.READ_REPLICA and (state is None or not state.wrote):
+            # Запись из команды или потока миниатюр тоже сдвигает версии.
+            mark_write()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия основной базы, объекты из них совместимы.
+        aliases = {DEFAULT_DB_ALIAS, settings.READ_REPLICA}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
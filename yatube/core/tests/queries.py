@@ -0,0 +1,84 @@
+import difflib
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDERS = re.compile(r'\(\?(?:, \?)*\)')
+OFFSET = re.compile(r' OFFSET \?')
+# Полный проход таблицы: SCAN без индекса. Подзапросы и
+# материализованные представления SQLite называет иначе.
+FULL_SCAN = re.compile(r'^SCAN (?!.*\bUSING\b)(?!SUBQUERY|CONSTANT)\S+$')
+
+
+def normalize(sql):
+    """SQL без значений: запросы, отличающиеся параметрами, совпадают.
+
+    Списки IN (...) любой длины и OFFSET тоже сводятся к одному виду.
+    """
+    sql = PLACEHOLDERS.sub('(...)', LITERAL.sub('?', sql))
+    return OFFSET.sub('', sql)
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def format_queries(queries):
+    """Нумерованный список SQL; повторы одного запроса помечены ×N."""
+    repeats = Counter(normalize(query['sql']) for query in queries)
+    lines = []
+    for number, query in enumerate(queries, 1):
+        count = repeats[normalize(query['sql'])]
+        mark = f'  [×{count}]' if count > 1 else ''
+        lines.append(f'{number:3}. {query["sql"]}{mark}')
+    return '\n'.join(lines)
+
+
+def diff_queries(expected, actual):
+    """Разница наборов запросов без учёта их порядка."""
+    return '\n'.join(difflib.unified_diff(
+        sorted(normalize(query['sql']) for query in expected),
+        sorted(normalize(query['sql']) for query in actual),
+        'ожидалось', 'получено', lineterm=''
+    ))
+
+
+class QueryAssertionsMixin:
+    """Проверки числа и планов SQL-запросов с читаемым выводом."""
+
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = context.captured_queries
+        if len(queries) > budget:
+            self.fail(
+                f'{len(queries)} SQL-запросов при бюджете {budget}:\n'
+                + format_queries(queries)
+            )
+
+    def assertSameQueries(self, expected, actual):
+        diff = diff_queries(expected, actual)
+        if diff:
+            self.fail('Запросы различаются:\n' + diff)
+
+    def assertIndexedPlan(self, sql):
+        """Запрос идёт по индексам, без полного прохода и сортировки."""
+        plan = query_plan(sql)
+        problems = [
+            row for row in plan
+            if 'TEMP B-TREE' in row or FULL_SCAN.match(row)
+        ]
+        if problems or not any('USING' in row for row in plan):
+            self.fail(
+                f'{sql}\n\nПлан запроса:\n' + '\n'.join(
+                    f'{"!" if row in problems else " "} {row}'
+                    for row in plan
+                )
+            )
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from core.cache import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'cache.sqlite3')
+        self.addCleanup(shutil.rmtree, directory, True)
+
+    def worker(self, **options):
+        # Отдельный экземпляр на тот же файл — как соседний воркер.
+        return SQLiteCache(self.path, {'OPTIONS': options})
+
+    def test_shared_between_workers(self):
+        self.worker().set('key', {'value': 1})
+        self.assertEqual(self.worker().get('key'), {'value': 1})
+
+    def test_add_and_incr(self):
+        cache = self.worker()
+        self.assertTrue(cache.add('key', 1))
+        self.assertFalse(cache.add('key', 2))
+        self.assertEqual(self.worker().incr('key'), 2)
+        self.assertEqual(cache.get('key'), 2)
+        cache.delete('key')
+        with self.assertRaises(ValueError):
+            cache.incr('key')
+
+    def test_stale_while_revalidate(self):
+        first, second = self.worker(), self.worker()
+        first.set('key', 'old', timeout=0.01)
+        time.sleep(0.02)
+        # Первый читатель берёт пересчёт на себя, второй получает
+        # устаревшее значение, а не промах.
+        self.assertIsNone(first.get('key'))
+        self.assertEqual(second.get('key'), 'old')
+        first.set('key', 'new')
+        self.assertEqual(second.get('key'), 'new')
+
+    def test_expired_beyond_stale_timeout(self):
+        cache = self.worker(STALE_TIMEOUT=0)
+        cache.set('key', 'old', timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('key'))
+        self.assertTrue(cache.add('key', 'new'))
+
+    def test_get_or_set_single_flight(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.worker().get_or_set('key', compute)
+                )
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_cull(self):
+        cache = self.worker(MAX_ENTRIES=10, CULL_FREQUENCY=2)
+        for number in range(20):
+            cache.set(f'key{number}', number)
+        self.assertLessEqual(
+            cache._db.execute('SELECT COUNT(*) FROM cache').fetchone()[0], 10
+        )
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+COMMENT = 'Комментарий, который ещё пишется'
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class SQLitePragmasTests(TestCase):
+    def test_pragmas(self):
+        pragmas = settings.SQLITE_PRAGMAS
+        self.assertEqual(pragma('journal_mode'), 'wal')
+        self.assertEqual(pragma('synchronous'), 1)
+        self.assertEqual(pragma('temp_store'), 2)
+        for name in ('cache_size', 'mmap_size', 'busy_timeout'):
+            with self.subTest(name=name):
+                self.assertEqual(pragma(name), pragmas[name])
+
+
+class ConcurrentReadsTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Joshua')
+        self.post = Post.objects.create(author=self.user, text='text')
+
+    def test_readers_continue_while_comment_is_written(self):
+        written = threading.Event()
+        release = threading.Event()
+
+        def hold(sender, **kwargs):
+            # Комментарий вставлен, транзакция add_comment ещё открыта.
+            written.set()
+            release.wait(5)
+
+        post_save.connect(hold, sender=Comment)
+        self.addCleanup(post_save.disconnect, hold, sender=Comment)
+        client = Client()
+        client.force_login(self.user)
+
+        def write():
+            try:
+                with transaction.atomic():
+                    client.post(
+                        reverse('posts:add_comment', args=[self.post.pk]),
+                        {'text': COMMENT}
+                    )
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            self.assertTrue(written.wait(5))
+            started = time.monotonic()
+            response = Client().get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            )
+            elapsed = time.monotonic() - started
+        finally:
+            release.set()
+            writer.join()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, COMMENT)
+        self.assertLess(
+            elapsed, settings.SQLITE_PRAGMAS['busy_timeout'] / 2000
+        )
+        self.assertTrue(Comment.objects.filter(text=COMMENT).exists())
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics, timing
+from posts.models import Post, User
+
+HOME_URL = reverse('posts:index')
+METRICS_URL = reverse('metrics')
+METRICS_DIR = tempfile.mkdtemp()
+# Такого pid на хосте нет: воркер уже завершился.
+DEAD_PID = 2 ** 22 + 1
+
+
+@override_settings(METRICS_DIR=METRICS_DIR, METRICS_ALLOWED_IPS=('127.0.0.1',))
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='Joshua')
+        Post.objects.create(author=user, text='text')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        timing.reset()
+        for name in os.listdir(METRICS_DIR):
+            os.remove(os.path.join(METRICS_DIR, name))
+
+    def test_histogram_per_view(self):
+        self.client.get(HOME_URL)
+        response = self.client.get(METRICS_URL)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            content
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 1',
+            content
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', content)
+        self.assertIn('yatube_cache_hit_ratio{view="posts:index"}', content)
+        self.assertIn(
+            f'yatube_process_resident_memory_bytes{{pid="{os.getpid()}"}}',
+            content
+        )
+
+    def write_worker(self, pid, started, counters):
+        worker = metrics.snapshot()
+        worker.update(pid=pid, started=started, counters=counters)
+        name = f'{pid}-{started}.json'
+        with open(os.path.join(METRICS_DIR, name), 'w') as file:
+            json.dump(worker, file)
+        return name
+
+    def test_workers_aggregated(self):
+        self.client.get(HOME_URL)
+        generated = metrics.snapshot()['counters'].get(
+            'thumbnails_generated', 0
+        )
+        name = self.write_worker(DEAD_PID, 1, {'thumbnails_generated': 3})
+        for _ in range(2):
+            # Повторный запрос не складывает архивный снимок ещё раз.
+            content = self.client.get(METRICS_URL).content.decode()
+            self.assertIn(
+                'yatube_request_duration_seconds_count{view="posts:index"} 2',
+                content
+            )
+            self.assertIn(
+                f'yatube_thumbnails_generated_total {generated + 3}',
+                content
+            )
+            # Память завершившегося воркера не показывается.
+            self.assertNotIn(f'pid="{DEAD_PID}"', content)
+        self.assertNotIn(name, os.listdir(METRICS_DIR))
+        self.assertIn(metrics.ARCHIVE, os.listdir(METRICS_DIR))
+
+    def test_reused_pid_keeps_counters(self):
+        # Прежний воркер с тем же pid: его снимок уходит в архив.
+        self.write_worker(os.getpid(), 1, {'reused': 4})
+        self.client.get(METRICS_URL)
+        content = self.client.get(METRICS_URL).content.decode()
+        self.assertIn('yatube_reused_total 4', content)
+        self.assertEqual(content.count(
+            f'yatube_process_resident_memory_bytes{{pid="{os.getpid()}"}}'
+        ), 1)
+
+    def test_access(self):
+        guest = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(guest.status_code, 404)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core import routers
+from posts import text
+from posts.models import Comment, Post, User
+
+REPLICA = 'replica_test'
+PRIMARY_TEXT = 'Пост, который есть только в основной базе'
+REPLICA_TEXT = 'Пост, который есть только в реплике'
+COMMENT = 'Мой свежий комментарий'
+
+
+@override_settings(READ_REPLICA=REPLICA)
+class ReplicaRouterTests(TransactionTestCase):
+    """Основная база и реплика — два разных файла SQLite."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.databases[REPLICA] = dict(
+            connections['default'].settings_dict,
+            NAME=os.path.join(cls.directory, 'replica.sqlite3'),
+        )
+        call_command('migrate', database=REPLICA, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        for model in (Comment, Post, User):
+            model.objects.using(REPLICA).all().delete()
+        self.user = User.objects.create_user(username='Joshua')
+        self.post = Post.objects.create(author=self.user, text=PRIMARY_TEXT)
+        # Реплика успела получить пользователя и его пост, но не всё.
+        User.objects.using(REPLICA).bulk_create([self.user])
+        replica_post = Post(
+            pk=self.post.pk, author=self.user, text=REPLICA_TEXT
+        )
+        text.fill(replica_post)
+        Post.objects.using(REPLICA).bulk_create([replica_post])
+        self.client = Client()
+        self.client.force_login(self.user)
+        # Окно отставания после записей выше уже прошло.
+        cache.clear()
+
+    def test_feeds_read_from_replica(self):
+        for url in [
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ]:
+            with self.subTest(url=url):
+                response = Client().get(url)
+                self.assertContains(response, REPLICA_TEXT)
+                self.assertNotContains(response, PRIMARY_TEXT)
+
+    def test_writes_go_to_primary(self):
+        self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': COMMENT}
+        )
+        self.assertTrue(Comment.objects.filter(text=COMMENT).exists())
+        self.assertFalse(
+            Comment.objects.using(REPLICA).filter(text=COMMENT).exists()
+        )
+
+    def test_writer_pinned_to_primary(self):
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': COMMENT}
+        )
+        cookie = response.cookies[settings.READ_REPLICA_PIN_COOKIE]
+        self.assertEqual(
+            cookie['max-age'], settings.READ_REPLICA_PIN_SECONDS
+        )
+        self.assertContains(self.client.get(url), COMMENT)
+        # Без куки и после окна отставания тот же пользователь читает
+        # реплику, где комментария ещё нет.
+        self.client.cookies.pop(settings.READ_REPLICA_PIN_COOKIE)
+        cache.delete(routers.RECENT_WRITE_KEY)
+        self.assertNotContains(self.client.get(url), COMMENT)
+
+    def test_recent_write_reads_primary(self):
+        # Сразу после чужой записи реплика может отставать: страница
+        # читается из основной базы и кешируется уже с новой версией.
+        Post.objects.filter(pk=self.post.pk).update(text=PRIMARY_TEXT)
+        Post.objects.get(pk=self.post.pk).save()
+        url = reverse('posts:index')
+        self.assertContains(Client().get(url), PRIMARY_TEXT)
+        cache.delete(routers.RECENT_WRITE_KEY)
+        self.assertContains(Client().get(url), PRIMARY_TEXT)
+
+    def test_reads_do_not_pin(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(settings.READ_REPLICA_PIN_COOKIE, response.cookies)
+
+    @override_settings(READ_REPLICA=None)
+    def test_disabled(self):
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, PRIMARY_TEXT)
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import timing
+from posts.models import Post, User
+
+HOME_URL = reverse('posts:index')
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='Joshua')
+        Post.objects.create(author=user, text='text')
+
+    def setUp(self):
+        cache.clear()
+        timing.reset()
+
+    def test_header(self):
+        header = self.client.get(HOME_URL)['Server-Timing']
+        for metric in ('total;dur=', 'db;dur=', 'tpl;dur=', 'cache;desc='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+        self.assertNotIn('desc="0 SQL"', header)
+
+    def test_histogram_per_view(self):
+        self.client.get(HOME_URL)
+        self.client.get(HOME_URL)
+        histogram = timing.histograms()['posts:index']
+        self.assertEqual(histogram['count'], 2)
+        self.assertEqual(histogram['buckets'][-1], 2)
+        self.assertGreater(histogram['sql_count'], 0)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        response = Client().get(HOME_URL)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(timing.histograms(), {})
@@ -0,0 +1,127 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from django.template import base as template_base
+
+# Границы корзин гистограммы длительности запросов, в секундах.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_current = ContextVar('request_timing', default=None)
+_histograms = {}
+_histograms_lock = threading.Lock()
+_template_render = None
+
+
+class RequestTiming:
+    """Счётчики одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def header(self):
+        return ', '.join([
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} SQL"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hit {self.cache_misses} miss"',
+        ])
+
+
+def start():
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def sql(execute, sql, params, many, context):
+    """Обёртка для connection.execute_wrapper()."""
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.sql_time += time.perf_counter() - started
+        timing.sql_count += 1
+
+
+def cache_lookup(hit):
+    timing = _current.get()
+    if timing is None:
+        return
+    if hit:
+        timing.cache_hits += 1
+    else:
+        timing.cache_misses += 1
+
+
+def _timed_render(self, context):
+    timing = _current.get()
+    if timing is None or timing.template_depth:
+        # Вложенные {% include %} уже учтены во внешнем шаблоне.
+        return _template_render(self, context)
+    timing.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _template_render(self, context)
+    finally:
+        timing.template_time += time.perf_counter() - started
+        timing.template_depth -= 1
+
+
+def instrument_templates():
+    global _template_render
+    if _template_render is None:
+        _template_render = template_base.Template.render
+        template_base.Template.render = _timed_render
+
+
+def observe(view_name, timing):
+    with _histograms_lock:
+        histogram = _histograms.get(view_name)
+        if histogram is None:
+            histogram = _histograms[view_name] = {
+                'buckets': [0] * len(BUCKETS),
+                'count': 0,
+                'sum': 0.0,
+                'sql_count': 0,
+                'cache_hits': 0,
+                'cache_misses': 0,
+            }
+        for index, bound in enumerate(BUCKETS):
+            if timing.total <= bound:
+                histogram['buckets'][index] += 1
+        histogram['count'] += 1
+        histogram['sum'] += timing.total
+        histogram['sql_count'] += timing.sql_count
+        histogram['cache_hits'] += timing.cache_hits
+        histogram['cache_misses'] += timing.cache_misses
+
+
+def histograms():
+    """Снимок гистограмм по имени view: корзины накопительные."""
+    with _histograms_lock:
+        return {
+            name: dict(histogram, buckets=list(histogram['buckets']))
+            for name, histogram in _histograms.items()
+        }
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
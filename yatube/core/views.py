@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from . import metrics as process_metrics
+
 
 def page_not_found(request, exception):
     return render(
@@ -20,3 +24,20 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics(request):
+    """Метрики всех воркеров в формате Prometheus.
+
+    Открыты персоналу и адресам из METRICS_ALLOWED_IPS, для остальных
+    адреса нет: в метриках pid воркеров и внутренние счётчики.
+    """
+    if not (
+        request.user.is_staff
+        or request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+    ):
+        raise Http404
+    return HttpResponse(
+        process_metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Post, Group
 
 
@@ -10,6 +11,11 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.filter_posts(queryset, search_term), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -3,3 +3,19 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from sorl.thumbnail import default
+
+        from core import metrics
+
+        from . import signals  # noqa: F401
+
+        metrics.register(
+            'thumbnail_kvstore_hits',
+            lambda: default.kvstore.stats()['hits']
+        )
+        metrics.register(
+            'thumbnail_kvstore_misses',
+            lambda: default.kvstore.stats()['misses']
+        )
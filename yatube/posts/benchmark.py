@@ -0,0 +1,221 @@
+import math
+import resource
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Comment, Follow, Group, Post, User
+from .paginators import NEXT, CursorPaginator
+
+# Эти адреса меняют данные: в замеры на общей базе они не входят.
+SKIPPED = ('posts:add_comment', 'posts:profile_follow',
+           'posts:profile_unfollow')
+ROLES = ('anonymous', 'authenticated')
+
+
+def percentile(values, percent):
+    """Значение по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _pages(count):
+    last = max(math.ceil(count / settings.POSTS_QUANTITY), 1)
+    return sorted({1, (last + 1) // 2, last})
+
+
+def _cursor(queryset, number):
+    """Курсор ссылки «Следующая» со страницы number - 1."""
+    paginator = CursorPaginator(queryset, settings.POSTS_QUANTITY)
+    previous = queryset.order_by('-pub_date', '-pk')[
+        (number - 1) * settings.POSTS_QUANTITY - 1
+    ]
+    return paginator.encode_cursor(NEXT, previous, number)
+
+
+def _paged(label, url, queryset):
+    """Страницы ленты: по номеру и, как при переходе по ссылкам, по
+    курсору — это разные запросы, и замерить нужно оба пути.
+    """
+    pages = _pages(queryset.count())
+    return [
+        (f'{label} page={page}', f'{url}?page={page}') for page in pages
+    ] + [
+        (f'{label} cursor={page}', f'{url}?cursor={_cursor(queryset, page)}')
+        for page in pages if page > 1
+    ]
+
+
+def reader():
+    """Пользователь, от имени которого идут авторизованные запросы."""
+    return User.objects.annotate(
+        authors=Count('follower')
+    ).order_by('-authors', 'pk').first()
+
+
+def cases(user):
+    """Список (метка, адрес) для всех безопасных адресов posts.urls.
+
+    Ленты проверяются на первой, средней и последней страницах, а
+    группа, профиль и пост выбираются самые крупные в базе.
+    """
+    group = Group.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total', 'pk').first()
+    author = User.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total', 'pk').first()
+    post = Post.objects.annotate(
+        total=Count('comments')
+    ).order_by('-total', 'pk').first()
+    own_post = Post.objects.filter(author=user).order_by('-pk').first()
+    word = post.text.split()[0].strip('.').lower()
+    result = _paged('posts:index', reverse('posts:index'), Post.objects)
+    if group:
+        result += _paged(
+            'posts:group_list',
+            reverse('posts:group_list', args=[group.slug]),
+            group.posts
+        )
+    result += _paged(
+        'posts:profile',
+        reverse('posts:profile', args=[author.username]),
+        author.posts
+    )
+    # Лента подписок листается по записям TimelineEntry, а не по постам.
+    result += _paged(
+        'posts:follow_index', reverse('posts:follow_index'), user.timeline
+    )
+    result += [
+        ('posts:post_detail',
+         reverse('posts:post_detail', args=[post.pk])),
+        ('posts:post_comments',
+         reverse('posts:post_comments', args=[post.pk])),
+        ('posts:search', f"{reverse('posts:search')}?q={word}"),
+        ('posts:post_create', reverse('posts:post_create')),
+    ]
+    if own_post:
+        result.append((
+            'posts:post_edit',
+            reverse('posts:post_edit', args=[own_post.pk])
+        ))
+    return result
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _request(client, url, cold):
+    if cold:
+        cache.clear()
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+    return response, elapsed, counter.count
+
+
+def measure(client, url, repeat, cold=False):
+    """Замеры одного адреса: задержка, запросы, байты, пик памяти.
+
+    Первый запрос прогревает кеш и миниатюры и в статистику не идёт.
+    Память считается отдельным запросом: tracemalloc заметно
+    замедляет код и исказил бы задержку.
+    """
+    if not cold:
+        _request(client, url, cold)
+    timings, queries = [], []
+    for _ in range(repeat):
+        response, elapsed, count = _request(client, url, cold)
+        timings.append(elapsed * 1000)
+        queries.append(count)
+    tracemalloc.start()
+    try:
+        _request(client, url, cold)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'url': url,
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'queries': max(queries),
+        'bytes': len(response.content),
+        'peak_memory_bytes': peak,
+    }
+
+
+def run(repeat=20, cold=False):
+    user = reader()
+    clients = {role: Client() for role in ROLES}
+    clients['authenticated'].force_login(user)
+    results = {}
+    for label, url in cases(user):
+        results[label] = {
+            role: measure(client, url, repeat, cold)
+            for role, client in clients.items()
+        }
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'repeat': repeat,
+            'cold': cold,
+            'user': user.username,
+            'skipped': list(SKIPPED),
+            'posts': Post.objects.count(),
+            'comments': Comment.objects.count(),
+            'follows': Follow.objects.count(),
+            # На Linux ru_maxrss в килобайтах.
+            'max_rss_bytes': resource.getrusage(
+                resource.RUSAGE_SELF
+            ).ru_maxrss * 1024,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=1.25):
+    """Регрессии текущего прогона относительно сохранённого.
+
+    Регрессией считается рост p95 больше чем в threshold раз и любой
+    рост числа SQL-запросов. Новые и пропавшие адреса не сравниваются.
+    """
+    regressions = []
+    for label, roles in current['results'].items():
+        for role, now in roles.items():
+            before = baseline['results'].get(label, {}).get(role)
+            if before is None:
+                continue
+            if now['p95_ms'] > before['p95_ms'] * threshold:
+                regressions.append(
+                    f'{label} ({role}): p95 {before["p95_ms"]} -> '
+                    f'{now["p95_ms"]} мс'
+                )
+            if now['queries'] > before['queries']:
+                regressions.append(
+                    f'{label} ({role}): запросов {before["queries"]} -> '
+                    f'{now["queries"]}'
+                )
+    return regressions
@@ -0,0 +1,81 @@
+import hashlib
+
+from django.db.models import (
+    Count, DateTimeField, IntegerField, Max, OuterRef, Subquery
+)
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition
+
+from .feed_cache import feed_version
+from .models import Comment, Group, Post, User
+
+
+def conditional_page(state):
+    """Отвечает 304 на If-None-Match без рендера.
+
+    state(request, **kwargs) дёшево возвращает части ETag или None,
+    если объекта нет: тогда запрос уходит во view и получает свой 404.
+    ETag зависит ещё от адреса с параметрами и от пользователя: шапка
+    и кнопки у всех разные. Last-Modified не отдаётся: счётчики,
+    удаления и подписки не оставляют даты, и If-Modified-Since
+    вернул бы 304 на изменившуюся страницу. Страницы пользователя
+    содержат CSRF-токен формы, поэтому его cookie тоже входит в ETag:
+    после повторного входа браузер не получит 304 со старым токеном.
+    """
+    def etag(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None:
+            return None
+        csrf = None
+        if request.user.is_authenticated:
+            # Токен создаётся заранее, чтобы cookie ушла и с ответом 304.
+            get_token(request)
+            csrf = request.META['CSRF_COOKIE']
+        value = repr(
+            (current, request.user.pk, csrf, request.get_full_path())
+        )
+        return hashlib.md5(value.encode()).hexdigest()
+
+    return condition(etag_func=etag)
+
+
+def index_state(request):
+    # Версия ленты меняется при любом изменении постов и групп.
+    return feed_version()
+
+
+def group_state(request, slug):
+    return Group.objects.filter(slug=slug).annotate(
+        last=Max('posts__updated'), count=Count('posts')
+    ).values_list('last', 'count').first()
+
+
+def profile_state(request, username):
+    return User.objects.filter(username=username).annotate(
+        last=Max('posts__updated')
+    ).values_list(
+        'last',
+        'stats__posts_count',
+        'stats__followers_count',
+        'stats__following_count',
+    ).first()
+
+
+def post_state(request, post_id):
+    # Подзапросы вместо JOIN + GROUP BY: оба идут по индексу комментариев.
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post')
+    return Post.objects.filter(pk=post_id).annotate(
+        comments_count=Subquery(
+            comments.annotate(count=Count('pk')).values('count'),
+            output_field=IntegerField()
+        ),
+        last_comment=Subquery(
+            comments.annotate(last=Max('created')).values('last'),
+            output_field=DateTimeField()
+        ),
+    ).values_list(
+        'updated', 'comments_count', 'last_comment',
+        'author__stats__posts_count',
+    ).first()
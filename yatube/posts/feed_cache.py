@@ -0,0 +1,24 @@
+import time
+
+from django.core.cache import cache
+
+FEED_VERSION_KEY = 'posts_feed_version'
+
+
+def _initial_version():
+    # Версия от времени, а не с единицы: если ключ вытеснен из кеша,
+    # старые фрагменты с прежними версиями не оживут.
+    return int(time.time() * 1000)
+
+
+def feed_version():
+    return cache.get_or_set(FEED_VERSION_KEY, _initial_version, None)
+
+
+def bump_feed_version():
+    try:
+        return cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        version = _initial_version()
+        cache.set(FEED_VERSION_KEY, version, None)
+        return version
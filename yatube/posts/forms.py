@@ -1,6 +1,10 @@
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
 
-from .models import Post, Comment
+from . import images
+from .models import Comment, Group, Post, User
 
 
 class PostForm(forms.ModelForm):
@@ -13,6 +17,28 @@ class PostForm(forms.ModelForm):
             'text': 'Текст поста'
         }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if not isinstance(image, UploadedFile):
+            return image
+        if image.size > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            raise forms.ValidationError('Слишком большой файл')
+        try:
+            return images.normalize(image)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            raise forms.ValidationError(
+                'Не удалось прочитать изображение'
+            )
+
+    def save(self, commit=True):
+        if 'image' in self.changed_data:
+            image = self.cleaned_data['image']
+            (
+                self.instance.image_width,
+                self.instance.image_height,
+            ) = getattr(image, 'image_size', (None, None))
+        return super().save(commit)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -20,3 +46,20 @@ class CommentForm(forms.ModelForm):
         fields = ('text',)
 
         labels = {'text': 'Текст комментария'}
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Поиск', max_length=200)
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        label='Группа',
+        to_field_name='slug',
+        required=False
+    )
+    author = forms.ModelChoiceField(
+        User.objects.all(),
+        label='Автор',
+        to_field_name='username',
+        required=False,
+        widget=forms.TextInput
+    )
@@ -0,0 +1,77 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+
+def content_name(data, extension):
+    digest = hashlib.sha256(data).hexdigest()
+    return f'{digest[:2]}/{digest}.{extension}'
+
+
+def _content(data, image_format, size):
+    content = ContentFile(
+        data, name=content_name(data, EXTENSIONS[image_format])
+    )
+    # Размеры уже известны: форма сохранит их в посте без чтения файла.
+    content.image_size = size
+    return content
+
+
+def _target_format(image):
+    """Формат для пересохранения: исходный, если его можно отдавать."""
+    if image.format == 'MPO':
+        # Снимки с телефонов: JPEG с дополнительными кадрами.
+        return 'JPEG'
+    if image.format in EXTENSIONS:
+        return image.format
+    # BMP, TIFF и прочее: без прозрачности JPEG заметно меньше PNG.
+    if _has_alpha(image):
+        return 'PNG'
+    return 'JPEG'
+
+
+def _has_alpha(image):
+    return 'A' in image.getbands() or 'transparency' in image.info
+
+
+def normalize(uploaded):
+    """Декодирует загрузку один раз, уменьшает и очищает её.
+
+    Картинка поворачивается по EXIF, вписывается в POST_IMAGE_MAX_SIZE
+    и пересохраняется без метаданных. Имя файла — хеш результата.
+    Повреждённый или неподдерживаемый файл даёт OSError или ValueError.
+    """
+    uploaded.seek(0)
+    image = Image.open(uploaded)
+    image_format = _target_format(image)
+    if image.format != 'MPO' and getattr(image, 'is_animated', False):
+        # Анимацию не пересобираем, сохраняем исходные байты.
+        uploaded.seek(0)
+        data = uploaded.read()
+        return _content(data, image_format, image.size)
+    if image_format == 'JPEG':
+        image.draft('RGB', settings.POST_IMAGE_MAX_SIZE)
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(settings.POST_IMAGE_MAX_SIZE, Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+        image = image.convert('RGBA' if _has_alpha(image) else 'RGB')
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        image_format,
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=True,
+    )
+    return _content(buffer.getvalue(), image_format, image.size)
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    KVStore as CachedDBKVStore
+)
+
+
+class KVStore(CachedDBKVStore):
+    """Хранилище ключей sorl с LRU в памяти процесса перед кешем и БД.
+
+    В LRU попадают только описания картинок: имена файлов адресуются
+    по содержимому, поэтому такие записи не меняются и не могут
+    устареть в соседнем процессе. Изменяемые списки миниатюр всегда
+    читаются из общего кеша.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cacheable(self, key):
+        return key.startswith(add_prefix('', 'image'))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > settings.THUMBNAIL_LRU_SIZE:
+                self._lru.popitem(last=False)
+
+    def _forget(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._lru.pop(key, None)
+
+    def _get_raw(self, key):
+        if not self._cacheable(key):
+            return super()._get_raw(key)
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = super()._get_raw(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def _set_raw(self, key, value):
+        super()._set_raw(key, value)
+        if self._cacheable(key):
+            self._remember(key, value)
+
+    def _delete_raw(self, *keys):
+        super()._delete_raw(*keys)
+        self._forget(*keys)
+
+    def clear(self, delete_thumbnails=False):
+        super().clear(delete_thumbnails)
+        with self._lock:
+            self._lru.clear()
+
+    def evict(self, image_file):
+        """Убирает из LRU картинку и все её миниатюры."""
+        keys = [image_file.key]
+        keys += self._get(image_file.key, identity='thumbnails') or []
+        self._forget(*(add_prefix(key) for key in keys))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._lru),
+            }
@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmark
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет страницы posts на заполненной базе и сравнивает '
+        'результат с сохранённым'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кеш перед каждым запросом'
+        )
+        parser.add_argument('--output', help='Куда сохранить результат')
+        parser.add_argument(
+            '--baseline',
+            help='Сохранённый результат для сравнения'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=1.25,
+            help='Во сколько раз может вырасти p95'
+        )
+
+    def handle(self, *args, **options):
+        if not Post.objects.exists():
+            raise CommandError(
+                'База пуста, сначала выполните manage.py seed_yatube'
+            )
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть больше нуля')
+        result = benchmark.run(options['repeat'], options['cold'])
+        for label, roles in result['results'].items():
+            for role, row in roles.items():
+                self.stdout.write(
+                    f'{label:<32} {role:<13} {row["status"]} '
+                    f'p50={row["p50_ms"]:.1f} p95={row["p95_ms"]:.1f} '
+                    f'p99={row["p99_ms"]:.1f} мс '
+                    f'sql={row["queries"]} bytes={row["bytes"]} '
+                    f'peak={row["peak_memory_bytes"]}'
+                )
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(result, file, ensure_ascii=False, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+            regressions = benchmark.compare(
+                baseline, result, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write('Регрессий нет')
@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts import thumbnails
+from posts.models import Post
+
+
+def generate(name):
+    try:
+        thumbnails.generate(name)
+    except Exception as error:
+        return error
+    return None
+
+
+def generate_in_thread(name):
+    try:
+        return generate(name)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Заранее создаёт миниатюры для загруженных картинок постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Число параллельных потоков'
+        )
+
+    def handle(self, *args, **options):
+        # Картинки лежат в подкаталогах по хешу содержимого: имена
+        # берутся из постов, а не из листинга хранилища.
+        names = list(
+            Post.objects.exclude(image='').order_by('image').values_list(
+                'image', flat=True
+            ).distinct()
+        )
+        if not names:
+            self.stdout.write('Картинок нет')
+            return
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                errors = list(executor.map(generate_in_thread, names))
+        else:
+            errors = [generate(name) for name in names]
+        for name, error in zip(names, errors):
+            if error:
+                self.stderr.write(f'{name}: {error}')
+        self.stdout.write(f'Обработано картинок: {len(names)}')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов'
+
+    def handle(self, *args, **options):
+        if not search.enabled():
+            raise CommandError(
+                'Полнотекстовый индекс доступен только в SQLite'
+            )
+        with transaction.atomic():
+            search.create_index()
+            search.rebuild()
+        self.stdout.write('Поисковый индекс пересобран')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и подписок авторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created, changed = stats.reconcile(options['batch_size'])
+        self.stdout.write(
+            f'Создано записей: {created}, исправлено: {changed}'
+        )
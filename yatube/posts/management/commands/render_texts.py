@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import text
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Заново готовит HTML и анонсы текстов постов и комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        posts = text.backfill(Post, options['batch_size'])
+        comments = text.backfill(Comment, options['batch_size'])
+        self.stdout.write(
+            f'Постов: {posts}, комментариев: {comments}'
+        )
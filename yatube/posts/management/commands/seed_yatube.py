@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.models import User
+from posts.seed import Seeder
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими пользователями, постами и подписками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument(
+            '--images',
+            type=float,
+            default=0.0,
+            help='Доля постов с картинкой-заглушкой'
+        )
+        parser.add_argument(
+            '--exponent',
+            type=float,
+            default=1.1,
+            help='Показатель степенного закона популярности'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько дней до запуска распределены посты'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Префикс имён пользователей и адресов групп'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом «{prefix}» уже есть, '
+                'выберите другой --prefix'
+            )
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь')
+        seeder = Seeder(
+            seed=options['seed'],
+            exponent=options['exponent'],
+            days=options['days'],
+            images=options['images'],
+            prefix=prefix,
+            batch_size=options['batch_size'],
+        )
+        with transaction.atomic():
+            created = seeder.run(
+                options['users'],
+                options['groups'],
+                options['posts'],
+                options['comments'],
+                options['follows'],
+            )
+        self.stdout.write(', '.join(
+            f'{name}: {count}' for name, count in created.items()
+        ))
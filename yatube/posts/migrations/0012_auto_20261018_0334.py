@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_timelines(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    schema_editor.execute(
+        f'INSERT INTO {TimelineEntry._meta.db_table} '
+        '(user_id, post_id, author_id, pub_date) '
+        'SELECT user_id, post_id, author_id, pub_date FROM ('
+        'SELECT follow.user_id, post.id AS post_id, post.author_id, '
+        'post.pub_date, ROW_NUMBER() OVER ('
+        'PARTITION BY follow.user_id '
+        'ORDER BY post.pub_date DESC, post.id DESC) AS position '
+        'FROM (SELECT DISTINCT user_id, author_id '
+        f'FROM {Follow._meta.db_table}) AS follow '
+        f'JOIN {Post._meta.db_table} AS post '
+        'ON post.author_id = follow.author_id'
+        ') AS ranked WHERE position <= %s',
+        [settings.TIMELINE_LENGTH]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_auto_20211010_1647'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Читатель')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Лента подписок',
+                'ordering': ('-pub_date', '-pk'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date'], name='posts_timel_user_id_b48120_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timelineentry',
+            unique_together={('user', 'post')},
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from posts import search
+
+    if search.enabled(schema_editor.connection):
+        search.create_index(schema_editor.connection)
+        search.rebuild(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from posts import search
+
+    if search.enabled(schema_editor.connection):
+        search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_auto_20261018_0340'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def fill_updated(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(updated=models.F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_auto_20261018_0349'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Изменён'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated, migrations.RunPython.noop),
+    ]
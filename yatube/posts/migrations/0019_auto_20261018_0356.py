@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:56
+
+from django.db import migrations, models
+
+
+def fill_html(apps, schema_editor):
+    from posts import text
+
+    text.backfill(apps.get_model('posts', 'Post'))
+    text.backfill(apps.get_model('posts', 'Comment'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_html, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -18,9 +20,38 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'excerpt',
+        'pub_date',
+        'updated',
+        'image',
+        'image_width',
+        'image_height',
+        'author__username',
+        'group__title',
+        'group__slug',
+    )
+
+    def for_feed(self):
+        return self.select_related('author', 'group').only(
+            *self.FEED_FIELDS
+        ).order_by('-pub_date', '-pk')
+
+    def for_detail(self):
+        return self.select_related('author', 'group').only(
+            *self.FEED_FIELDS, 'text', 'text_html'
+        )
+
+
 class Post(models.Model):
     text = models.TextField()
+    # Готовый HTML текста и анонса, заполняются при сохранении.
+    text_html = models.TextField(editable=False, blank=True)
+    excerpt = models.TextField(editable=False, blank=True)
     pub_date = models.DateTimeField(auto_now_add=True)
+    # Версия карточки поста: ключ её кеша во фрагментах шаблонов.
+    updated = models.DateTimeField('Изменён', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -37,11 +68,31 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to=f'{ settings.UPLOAD_POST }/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    image_width = models.PositiveIntegerField(
+        'Ширина картинки',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота картинки',
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['-pub_date', '-id']),
+            models.Index(fields=['author', '-pub_date', '-id']),
+            models.Index(fields=['group', '-pub_date', '-id']),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -49,8 +100,16 @@ class Post(models.Model):
         return self.title
 
 
+class CommentQuerySet(models.QuerySet):
+    def for_feed(self):
+        return self.select_related('author').only(
+            'text_html', 'created', 'post_id', 'author__username'
+        ).order_by('-created', '-pk')
+
+
 class Comment(models.Model):
     text = models.TextField()
+    text_html = models.TextField(editable=False, blank=True)
     created = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(
         User,
@@ -64,8 +123,11 @@ class Comment(models.Model):
         verbose_name='Пост',
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('-created',)
+        indexes = [models.Index(fields=['post', '-created', '-id'])]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -85,5 +147,51 @@ class Follow(models.Model):
     )
 
     class Meta:
+        indexes = [models.Index(fields=['user', 'author'])]
         verbose_name = 'Подписчик'
         verbose_name_plural = 'Подписчики'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-pk')
+        unique_together = ('user', 'post')
+        indexes = [models.Index(fields=['user', '-pub_date', '-id'])]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
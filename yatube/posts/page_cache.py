@@ -0,0 +1,117 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import parse_http_date_safe
+
+
+def _page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{path}'
+
+
+def _tag_key(tag):
+    return f'page_tag:{tag}'
+
+
+def tag_versions(tags):
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def _bump(tags):
+    cache.set_many({_tag_key(tag): time.time_ns() for tag in tags}, None)
+
+
+def purge(*tags):
+    """Сбрасывает все страницы, помеченные хотя бы одним из тегов.
+
+    Повторный сброс после коммита убирает страницы, которые успели
+    закешировать по ещё не закоммиченным данным.
+    """
+    tags = [tag for tag in tags if tag]
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def _cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def _headers(response, created):
+    patch_cache_control(
+        response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE
+    )
+    patch_vary_headers(response, ['Cookie'])
+    response['Age'] = max(int(time.time() - created), 0)
+    return response
+
+
+def cache_anonymous_page(view):
+    """Кеширует ответ для гостей целиком.
+
+    View помечает ответ тегами в response.cache_tags. Запись отдаётся,
+    пока версии всех её тегов не изменились: purge() из сигналов
+    сбрасывает ровно те страницы, которые выводят изменённые данные.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view(request, *args, **kwargs)
+        key = _page_key(request)
+        entry = cache.get(key)
+        if entry and tag_versions(entry['tags']) == entry['tags']:
+            headers = entry['headers']
+            response = get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    headers.get('Last-Modified', '')
+                ),
+            ) or HttpResponse(entry['content'])
+            for header, value in headers.items():
+                response[header] = value
+            return _headers(response, entry['created'])
+        started = time.time_ns()
+        response = view(request, *args, **kwargs)
+        tags = getattr(response, 'cache_tags', None)
+        if (
+            request.method != 'GET'
+            or response.status_code != 200
+            or not tags
+            or response.cookies
+        ):
+            return response
+        versions = tag_versions(tags)
+        if max(versions.values()) > started:
+            # Пока страница рисовалась, данные изменились (или тег
+            # появился впервые): такой ответ кешировать нельзя.
+            return response
+        created = time.time()
+        cache.set(key, {
+            'content': response.content,
+            'headers': {
+                header: response[header]
+                for header in ('Content-Type', 'ETag', 'Last-Modified')
+                if response.has_header(header)
+            },
+            'tags': versions,
+            'created': created,
+        }, settings.PAGE_CACHE_TIMEOUT)
+        return _headers(response, created)
+    return wrapper
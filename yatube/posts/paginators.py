@@ -0,0 +1,185 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import SimpleLazyObject, cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+# Значение ?page= для последней страницы.
+LAST = 'last'
+
+
+def count_cache_key(name):
+    return f'posts_count:{name}'
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который берёт общее число объектов из кеша.
+
+    COUNT(*) выполняется только при промахе кеша; ключ сбрасывается
+    сигналами при создании и удалении постов. Вместо полного page_range
+    отдаёт окно страниц вокруг текущей.
+    """
+
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, count_key=None):
+        super().__init__(object_list, per_page)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        return cache.get_or_set(
+            count_cache_key(self.count_key),
+            self.object_list.count,
+            settings.PAGINATOR_COUNT_TIMEOUT,
+        )
+
+    def _get_page(self, *args, **kwargs):
+        page = super()._get_page(*args, **kwargs)
+        # Окно страниц требует общего числа объектов: считаем его, только
+        # если шаблон действительно выводит нумерацию.
+        page.page_range = SimpleLazyObject(
+            lambda: list(self.get_elided_page_range(page.number))
+        )
+        return page
+
+    def get_elided_page_range(self, number, on_each_side=2, on_ends=1):
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1, self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+
+class CursorPaginator(CachedCountPaginator):
+    """Keyset-пагинатор по паре (date_field, pk) в порядке убывания.
+
+    Вместо OFFSET каждая страница выбирается условием «строго до/после
+    курсора», поэтому глубокие страницы стоят столько же, сколько первая.
+    Курсор — непрозрачный токен для параметра ?cursor=, в нём же хранится
+    номер страницы для окна навигации. Переход по ?page= остаётся для
+    прыжков на произвольную страницу; последняя страница, как и
+    предыдущая по курсору, выбирается с начала ленты, без OFFSET.
+    """
+
+    def __init__(self, object_list, per_page, count_key=None,
+                 date_field='pub_date'):
+        super().__init__(object_list, per_page, count_key)
+        self.date_field = date_field
+
+    def encode_cursor(self, direction, obj, number):
+        value = '|'.join([
+            direction,
+            getattr(obj, self.date_field).isoformat(),
+            str(obj.pk),
+            str(number),
+        ])
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            value = base64.urlsafe_b64decode(cursor.encode()).decode()
+            direction, date, pk, number = value.split('|')
+            date, pk, number = parse_datetime(date), int(pk), int(number)
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if direction not in (NEXT, PREVIOUS) or date is None:
+            return None
+        return direction, date, pk, max(number, 1)
+
+    def _ordered(self):
+        return self.object_list.order_by(f'-{self.date_field}', '-pk')
+
+    def _keyset(self, direction, date, pk):
+        # Условие вида «date <= d AND (date < d OR pk < id)»: первая часть
+        # даёт SQLite диапазон по индексу, вторая отсекает уже показанное.
+        lookup = 'lt' if direction == NEXT else 'gt'
+        queryset = self.object_list.filter(
+            **{f'{self.date_field}__{lookup}e': date}
+        ).filter(
+            Q(**{f'{self.date_field}__{lookup}': date})
+            | Q(**{f'pk__{lookup}': pk})
+        )
+        if direction == NEXT:
+            return queryset.order_by(f'-{self.date_field}', '-pk')
+        return queryset.order_by(self.date_field, 'pk')
+
+    def _first(self):
+        rows = list(self._ordered()[:self.per_page + 1])
+        return rows[:self.per_page], 1, False, len(rows) > self.per_page
+
+    def _last(self):
+        number = self.num_pages
+        size = self.count - (number - 1) * self.per_page
+        rows = list(
+            self.object_list.order_by(self.date_field, 'pk')[:max(size, 0)]
+        )
+        rows.reverse()
+        return rows, number, number > 1, False
+
+    def _numbered(self, number):
+        if number == LAST:
+            return self._last()
+        number = self.validate_number(number)
+        if number == self.num_pages:
+            return self._last()
+        bottom = (number - 1) * self.per_page
+        rows = list(self._ordered()[bottom:bottom + self.per_page])
+        return rows, number, number > 1, number < self.num_pages
+
+    def _cursor(self, direction, date, pk, number):
+        rows = list(self._keyset(direction, date, pk)[:self.per_page + 1])
+        extra = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == NEXT:
+            return rows, number, True, extra
+        if not extra:
+            # Дошли до начала ленты: показываем полную первую страницу.
+            return self._first()
+        rows.reverse()
+        return rows, max(number, 2), True, True
+
+    def page(self, cursor=None, number=None):
+        decoded = cursor and self.decode_cursor(cursor)
+        if decoded:
+            rows, number, has_previous, has_next = self._cursor(*decoded)
+        elif number is not None:
+            rows, number, has_previous, has_next = self._numbered(number)
+        else:
+            rows, number, has_previous, has_next = self._first()
+        page = self._get_page(rows, number, self)
+        page.previous_cursor = (
+            self.encode_cursor(PREVIOUS, rows[0], number - 1)
+            if has_previous and rows else None
+        )
+        page.next_cursor = (
+            self.encode_cursor(NEXT, rows[-1], number + 1)
+            if has_next and rows else None
+        )
+        return page
+
+    def get_page(self, cursor=None, number=None):
+        try:
+            return self.page(cursor, number)
+        except PageNotAnInteger:
+            return self.page(cursor)
+        except EmptyPage:
+            return self.page(cursor, self.num_pages)
@@ -0,0 +1,77 @@
+import re
+
+from django.db import connection
+
+TABLE = 'posts_post_fts'
+POSTS_TABLE = 'posts_post'
+WORD = re.compile(r'\w+')
+
+
+def enabled(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def create_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} '
+            'USING fts5(text, tokenize="unicode61 remove_diacritics 2")'
+        )
+
+
+def drop_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def index_post(post):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)',
+            [post.pk, post.text]
+        )
+
+
+def unindex_post(post_id):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text) '
+            f'SELECT id, text FROM {POSTS_TABLE}'
+        )
+
+
+def match_expression(query):
+    # Каждое слово — отдельная фраза в кавычках: пользовательский ввод
+    # не может сломать синтаксис MATCH, а слова объединяются через AND.
+    return ' '.join(f'"{word}"' for word in WORD.findall(query))
+
+
+def filter_posts(queryset, query):
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not enabled():
+        for word in WORD.findall(query):
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+    return queryset.extra(
+        tables=[TABLE],
+        where=[
+            f'{TABLE}.rowid = {queryset.model._meta.db_table}.id',
+            f'{TABLE} MATCH %s',
+        ],
+        params=[expression],
+        select={'rank': f'{TABLE}.rank'},
+        order_by=['rank'],
+    )
@@ -0,0 +1,266 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from . import images, search, stats, text, timeline
+from .models import Comment, Follow, Group, Post, User
+
+WORDS = (
+    'автор', 'блог', 'вечер', 'город', 'дорога', 'друг', 'жизнь', 'закат',
+    'звезда', 'зима', 'идея', 'история', 'книга', 'кофе', 'лес', 'лето',
+    'море', 'музыка', 'мысль', 'небо', 'новость', 'ночь', 'облако',
+    'осень', 'память', 'песня', 'письмо', 'поезд', 'пост', 'работа',
+    'радость', 'река', 'сад', 'свет', 'слово', 'солнце', 'спорт',
+    'старт', 'страница', 'тишина', 'улица', 'утро', 'фото', 'хлеб',
+    'цвет', 'час', 'читатель', 'шаг', 'школа', 'эхо', 'юмор', 'язык',
+    'был', 'видел', 'думал', 'ждал', 'искал', 'писал', 'читал', 'шёл',
+    'очень', 'снова', 'всегда', 'сегодня', 'вчера', 'тихо', 'долго',
+    'и', 'в', 'на', 'с', 'но', 'что', 'как', 'это', 'мой', 'наш',
+)
+IMAGE_SIZES = ((1280, 720), (1080, 1080), (960, 1280), (1920, 1080))
+IMAGE_POOL = 16
+# Доля постов без группы.
+UNGROUPED = 0.3
+
+
+def power_law(rng, count, exponent):
+    """Накопленные веса для rng.choices(): вес элемента ранга r — 1/r^a.
+
+    Ранги перемешаны, чтобы популярными оказались не первые записи.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return list(accumulate(weights))
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Даёт bulk_create() записать свои значения в поля auto_now(_add)."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _field(model, name):
+    return model._meta.get_field(name)
+
+
+class Seeder:
+    """Генератор синтетических данных, воспроизводимый по seed.
+
+    Записи вставляются пачками через bulk_create(), который не шлёт
+    сигналов: HTML текстов, счётчики авторов, ленты подписок и
+    поисковый индекс готовятся здесь же, а кеш очищается в конце.
+    Детерминированы содержимое и связи; даты отсчитываются от момента
+    запуска.
+    """
+
+    def __init__(self, seed=0, exponent=1.1, days=365, images=0.0,
+                 prefix='seed', batch_size=2000):
+        self.rng = random.Random(seed)
+        self.exponent = exponent
+        self.images = images
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.until = timezone.now()
+        self.period = timedelta(days=days).total_seconds()
+
+    def _insert(self, model, objects):
+        """Вставляет объекты пачками и возвращает их pk по порядку.
+
+        SQLite не возвращает pk из bulk_create(), поэтому новые pk
+        читаются обратно: в одной транзакции они идут подряд.
+        """
+        last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        objects = iter(objects)
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            # Размер одного INSERT Django подберёт под лимиты SQLite.
+            model.objects.bulk_create(batch)
+        return list(
+            model.objects.filter(pk__gt=last).order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def _text(self, mu):
+        rng = self.rng
+        paragraphs = []
+        for _ in range(1 + int(rng.expovariate(1.5))):
+            count = max(3, min(int(rng.lognormvariate(mu, 0.9)), 1500))
+            words = rng.choices(WORDS, k=count)
+            paragraphs.append(' '.join(words).capitalize() + '.')
+        return '\n\n'.join(paragraphs)
+
+    def _placeholders(self):
+        field = _field(Post, 'image')
+        pool = []
+        for index in range(IMAGE_POOL):
+            size = self.rng.choice(IMAGE_SIZES)
+            image = Image.new('RGB', size, tuple(
+                self.rng.randrange(256) for _ in range(3)
+            ))
+            width, height = size
+            ImageDraw.Draw(image).ellipse(
+                (width // 4, height // 4, width * 3 // 4, height * 3 // 4),
+                fill=tuple(self.rng.randrange(256) for _ in range(3))
+            )
+            buffer = BytesIO()
+            image.save(buffer, 'JPEG', quality=settings.POST_IMAGE_QUALITY)
+            data = buffer.getvalue()
+            name = field.storage.save(
+                field.generate_filename(
+                    None, images.content_name(data, images.EXTENSIONS['JPEG'])
+                ),
+                ContentFile(data)
+            )
+            pool.append((name, width, height))
+        return pool
+
+    def users(self, count):
+        password = make_password(self.prefix)
+        return self._insert(User, (
+            User(username=f'{self.prefix}{index}', password=password)
+            for index in range(count)
+        ))
+
+    def groups(self, count):
+        return self._insert(Group, (
+            Group(
+                title=f'Группа {self.prefix} {index}',
+                slug=f'{self.prefix}-{index}',
+                description=self._text(2),
+            )
+            for index in range(count)
+        ))
+
+    def posts(self, count, user_ids, group_ids):
+        """Посты с авторами по степенному закону, от старых к новым."""
+        rng = self.rng
+        dates = sorted(
+            self.until - timedelta(seconds=rng.random() * self.period)
+            for _ in range(count)
+        )
+        authors = rng.choices(
+            user_ids, cum_weights=power_law(rng, len(user_ids), self.exponent),
+            k=count
+        )
+        group_weights = group_ids and power_law(
+            rng, len(group_ids), self.exponent
+        )
+        pool = self._placeholders() if self.images else []
+
+        def build():
+            for date, author_id in zip(dates, authors):
+                post = Post(
+                    text=self._text(3),
+                    author_id=author_id,
+                    pub_date=date,
+                    updated=date,
+                )
+                if group_ids and rng.random() >= UNGROUPED:
+                    post.group_id = rng.choices(
+                        group_ids, cum_weights=group_weights
+                    )[0]
+                if pool and rng.random() < self.images:
+                    name, width, height = rng.choice(pool)
+                    post.image = name
+                    post.image_width, post.image_height = width, height
+                text.fill(post)
+                yield post
+
+        with explicit_dates(_field(Post, 'pub_date'), _field(Post, 'updated')):
+            return self._insert(Post, build()), dates
+
+    def comments(self, count, post_ids, dates, user_ids):
+        """Комментарии: обсуждают в основном популярные посты."""
+        rng = self.rng
+        if not post_ids:
+            return []
+        posts = rng.choices(
+            range(len(post_ids)),
+            cum_weights=power_law(rng, len(post_ids), self.exponent),
+            k=count
+        )
+        authors = rng.choices(
+            user_ids, cum_weights=power_law(rng, len(user_ids), self.exponent),
+            k=count
+        )
+
+        def build():
+            for index, author_id in zip(posts, authors):
+                created = min(
+                    dates[index] + timedelta(hours=rng.expovariate(0.1)),
+                    self.until
+                )
+                comment = Comment(
+                    text=self._text(2),
+                    author_id=author_id,
+                    post_id=post_ids[index],
+                    created=created,
+                )
+                text.fill(comment)
+                yield comment
+
+        with explicit_dates(_field(Comment, 'created')):
+            return self._insert(Comment, build())
+
+    def follows(self, count, user_ids):
+        """Подписки: число подписчиков у авторов — степенной закон."""
+        rng = self.rng
+        count = min(count, len(user_ids) * (len(user_ids) - 1))
+        authors = power_law(rng, len(user_ids), self.exponent)
+        # Число подписок распределено мягче, чем число подписчиков.
+        followers = power_law(rng, len(user_ids), self.exponent / 2)
+        pairs = set()
+        attempts = count * 4
+        while len(pairs) < count and attempts:
+            attempts -= 1
+            user_id, = rng.choices(user_ids, cum_weights=followers)
+            author_id, = rng.choices(user_ids, cum_weights=authors)
+            if user_id != author_id:
+                pairs.add((user_id, author_id))
+        self._insert(Follow, (
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in sorted(pairs)
+        ))
+        return pairs
+
+    def run(self, users, groups, posts, comments, follows):
+        user_ids = self.users(users)
+        group_ids = self.groups(groups)
+        post_ids, dates = self.posts(posts, user_ids, group_ids)
+        comment_ids = self.comments(comments, post_ids, dates, user_ids)
+        pairs = self.follows(follows, user_ids)
+        stats.reconcile(self.batch_size)
+        timeline.rebuild_all()
+        if search.enabled():
+            search.create_index()
+            search.rebuild()
+        # Версии ленты, счётчики страниц и кеш страниц не знают
+        # о вставленных записях.
+        cache.clear()
+        return {
+            'users': len(user_ids),
+            'groups': len(group_ids),
+            'posts': len(post_ids),
+            'comments': len(comment_ids),
+            'follows': len(pairs),
+        }
@@ -0,0 +1,152 @@
+from django.core.cache import cache
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import page_cache, search, stats, text, thumbnails, timeline
+from .feed_cache import bump_feed_version
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+from .paginators import count_cache_key
+
+
+def reset_post_counts(post):
+    cache.delete_many([
+        count_cache_key('index'),
+        count_cache_key(f'group:{post.group_id}'),
+        count_cache_key(f'author:{post.author_id}'),
+    ])
+
+
+def purge_post_pages(post):
+    page_cache.purge(
+        f'author:{post.author_id}',
+        post.group_id and f'group:{post.group_id}',
+    )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def text_rendered(sender, instance, **kwargs):
+    text.fill(instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    old_name, old_group_id = Post.objects.filter(
+        pk=instance.pk
+    ).values_list('image', 'group_id').first() or (None, None)
+    if old_name and old_name != instance.image.name:
+        thumbnails.evict(old_name)
+    if old_group_id and old_group_id != instance.group_id:
+        cache.delete(count_cache_key(f'group:{old_group_id}'))
+        page_cache.purge(f'group:{old_group_id}')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    reset_post_counts(instance)
+    purge_post_pages(instance)
+    bump_feed_version()
+    search.index_post(instance)
+    if created:
+        stats.change(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # Записи лент удалятся каскадом: их читателей запоминаем заранее,
+    # а счётчики сбрасываем уже после удаления.
+    instance._timeline_readers = list(
+        instance.timeline_entries.values_list('user_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    reset_post_counts(instance)
+    timeline.reset_counts(getattr(instance, '_timeline_readers', []))
+    purge_post_pages(instance)
+    bump_feed_version()
+    search.unindex_post(instance.pk)
+    if instance.image:
+        thumbnails.evict(instance.image.name)
+    stats.change(instance.author_id, posts_count=-1)
+
+
+def touch_posts(posts):
+    """Сбрасывает кеш карточек: их ключ содержит Post.updated."""
+    posts.update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_feed_version()
+    page_cache.purge(f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_touched(sender, instance, created=False, **kwargs):
+    # Карточки выводят название и ссылку группы.
+    if not created:
+        touch_posts(instance.posts.all())
+
+
+@receiver(thumbnails.renditions_ready)
+def renditions_ready(sender, name, **kwargs):
+    # Карточки и страницы, закешированные с исходной картинкой,
+    # должны перейти на готовые варианты.
+    posts = Post.objects.filter(image=name)
+    touch_posts(posts)
+    for post in posts.only('author_id', 'group_id'):
+        purge_post_pages(post)
+    bump_feed_version()
+
+
+def purge_follow_pages(follow):
+    # Профили обоих пользователей выводят счётчики подписок.
+    page_cache.purge(f'author:{follow.author_id}', f'author:{follow.user_id}')
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        purge_follow_pages(instance)
+        stats.change(instance.author_id, followers_count=1)
+        stats.change(instance.user_id, following_count=1)
+        timeline.add_author(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    purge_follow_pages(instance)
+    stats.change(instance.author_id, followers_count=-1)
+    stats.change(instance.user_id, following_count=-1)
+    timeline.remove_author(instance.user_id, instance.author_id)
+
+
+@receiver(pre_save, sender=User)
+def user_changing(sender, instance, update_fields=None, **kwargs):
+    # Карточки выводят имя автора: их сбрасываем, только когда имя
+    # действительно изменилось, а не при смене пароля или входе.
+    instance._username_changed = instance.pk is not None and (
+        update_fields is None or 'username' in update_fields
+    ) and User.objects.filter(pk=instance.pk).exclude(
+        username=instance.username
+    ).exists()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.objects.create(user=instance)
+    elif getattr(instance, '_username_changed', False):
+        touch_posts(instance.posts.all())
+        bump_feed_version()
+        page_cache.purge(f'author:{instance.pk}')
@@ -0,0 +1,72 @@
+from django.db.models import Count, F
+
+from .models import AuthorStats, Follow, Post, User
+
+
+def change(user_id, **deltas):
+    AuthorStats.objects.filter(user_id=user_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def _counts(queryset, field):
+    return dict(
+        queryset.values(field).annotate(total=Count('pk')).values_list(
+            field, 'total'
+        )
+    )
+
+
+def recount(user_id):
+    return AuthorStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'posts_count': Post.objects.filter(author_id=user_id).count(),
+            'followers_count': Follow.objects.filter(
+                author_id=user_id
+            ).count(),
+            'following_count': Follow.objects.filter(
+                user_id=user_id
+            ).count(),
+        }
+    )[0]
+
+
+def get(user):
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        return recount(user.pk)
+
+
+def reconcile(batch_size=1000):
+    posts = _counts(Post.objects.order_by(), 'author_id')
+    followers = _counts(Follow.objects.order_by(), 'author_id')
+    following = _counts(Follow.objects.order_by(), 'user_id')
+    existing = {
+        stats.user_id: stats
+        for stats in AuthorStats.objects.all().iterator()
+    }
+    changed, created = [], []
+    for user_id in User.objects.values_list('pk', flat=True).iterator():
+        values = {
+            'posts_count': posts.get(user_id, 0),
+            'followers_count': followers.get(user_id, 0),
+            'following_count': following.get(user_id, 0),
+        }
+        stats = existing.get(user_id)
+        if stats is None:
+            created.append(AuthorStats(user_id=user_id, **values))
+        elif any(getattr(stats, key) != value
+                 for key, value in values.items()):
+            for key, value in values.items():
+                setattr(stats, key, value)
+            changed.append(stats)
+    # batch_size в bulk_create() Django 2.2 не ограничивает лимитом SQLite.
+    AuthorStats.objects.bulk_create(created)
+    AuthorStats.objects.bulk_update(
+        changed,
+        ['posts_count', 'followers_count', 'following_count'],
+        batch_size=batch_size
+    )
+    return len(created), len(changed)
@@ -0,0 +1,52 @@
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CONTENT_NAME = re.compile(r'(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}\.\w+$')
+
+
+def is_content_name(name):
+    """Имя вида <2hex>/<sha256>.<ext>, выданное images.content_name."""
+    return CONTENT_NAME.search(name.replace('\\', '/')) is not None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — хеш его содержимого.
+
+    Одинаковые файлы получают одно имя и хранятся один раз, поэтому
+    существующий файл не переименовывается и не перезаписывается.
+    Файлы с обычными именами (из админки, оболочки) сохраняются как
+    в FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        if is_content_name(name):
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if not is_content_name(name):
+            return super()._save(name, content)
+        if self.exists(name):
+            return name
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            # Параллельная загрузка того же файла запишет те же байты,
+            # так что атомарная замена безопасна.
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
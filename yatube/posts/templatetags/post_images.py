@@ -0,0 +1,83 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html, format_html_join
+
+from .. import thumbnails
+
+register = template.Library()
+
+
+def _ready(name, rendition, widths, image_format):
+    """Пары (ширина, миниатюра) для уже созданных вариантов."""
+    found = []
+    for width in widths:
+        thumbnail = thumbnails.find_rendition(
+            name, rendition, width, image_format
+        )
+        if thumbnail is not None:
+            found.append((width, thumbnail))
+    return found
+
+
+def _srcset(ready):
+    return ', '.join(
+        '{} {}w'.format(thumbnail.url, width) for width, thumbnail in ready
+    )
+
+
+@register.simple_tag
+def picture(post, rendition_name='card', css_class=''):
+    """Выводит <picture> с вариантами картинки поста разной ширины.
+
+    Размеры берутся из поста и настроек варианта, сам файл не читается:
+    адреса миниатюр приходят из хранилища ключей sorl. Варианты здесь
+    не создаются: пока пул миниатюр их не подготовил, в srcset идут
+    готовые ширины, а без них — исходная картинка.
+    """
+    if not post.image:
+        return ''
+    name = post.image.name
+    rendition = settings.POST_IMAGE_RENDITIONS[rendition_name]
+    widths = thumbnails.rendition_widths(rendition, post.image_width)
+    default_width = max(
+        [width for width in widths if width <= rendition['default']]
+        or widths[:1]
+    )
+    *formats, fallback = settings.POST_IMAGE_FORMATS
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (f'image/{image_format.lower()}', _srcset(ready),
+             rendition['sizes'])
+            for image_format, ready in (
+                (image_format, _ready(name, rendition, widths, image_format))
+                for image_format in formats
+            )
+            if ready
+        )
+    )
+    width, height = thumbnails.rendition_size(rendition, default_width)
+    ready = _ready(name, rendition, widths, fallback)
+    if ready:
+        _, image = min(
+            ready, key=lambda item: abs(item[0] - default_width)
+        )
+        src = image.url
+        srcset = format_html(
+            ' srcset="{}" sizes="{}"', _srcset(ready), rendition['sizes']
+        )
+    else:
+        src, srcset = post.image.url, ''
+        if post.image_width and post.image_height:
+            # Исходная картинка не обрезана по кадру варианта.
+            height = round(width * post.image_height / post.image_width)
+    return format_html(
+        '<picture>{}<img class="{}" src="{}"{} width="{}" height="{}" '
+        'loading="lazy" decoding="async" alt=""></picture>',
+        sources,
+        css_class,
+        src,
+        srcset,
+        width,
+        height,
+    )
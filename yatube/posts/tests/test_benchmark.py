@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from .. import benchmark
+
+TEMP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+VIEWS = (
+    'posts:index', 'posts:group_list', 'posts:profile',
+    'posts:post_detail', 'posts:follow_index',
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_DIR)
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'seed_yatube', users=10, groups=2, posts=40, comments=30,
+            follows=20, stdout=StringIO()
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def benchmark(self, *args):
+        output = os.path.join(TEMP_DIR, 'benchmark.json')
+        call_command(
+            'benchmark_posts', '--repeat=2', f'--output={output}', *args,
+            stdout=StringIO()
+        )
+        with open(output) as file:
+            return json.load(file)
+
+    def test_results(self):
+        results = self.benchmark()['results']
+        for view in VIEWS:
+            rows = [row for label, row in results.items()
+                    if label.split()[0] == view]
+            with self.subTest(view=view):
+                self.assertTrue(rows)
+                for row in rows:
+                    self.assertEqual(row['authenticated']['status'], 200)
+                    self.assertGreater(row['authenticated']['queries'], 0)
+                    self.assertGreater(row['authenticated']['bytes'], 0)
+                    self.assertGreaterEqual(
+                        row['anonymous']['p99_ms'],
+                        row['anonymous']['p50_ms']
+                    )
+        self.assertIn('posts:index page=4', results)
+        self.assertIn('posts:index cursor=4', results)
+
+    def test_cursor_cases_match_numbered_pages(self):
+        user = benchmark.reader()
+        self.client.force_login(user)
+        urls = dict(benchmark.cases(user))
+        cursors = [label for label in urls if ' cursor=' in label]
+        self.assertTrue(cursors)
+        for label in cursors:
+            view, number = label.split(' cursor=')
+            with self.subTest(label=label):
+                pages = [
+                    list(self.client.get(url).context['page_obj'])
+                    for url in (urls[label], urls[f'{view} page={number}'])
+                ]
+                self.assertEqual(*pages)
+                self.assertTrue(pages[0])
+
+    def test_compare(self):
+        baseline = self.benchmark()
+        current = json.loads(json.dumps(baseline))
+        row = current['results']['posts:post_detail']['authenticated']
+        row['queries'] += 1
+        row['p95_ms'] = baseline['results']['posts:post_detail'][
+            'authenticated']['p95_ms'] * 2 + 1
+        self.assertEqual(len(benchmark.compare(baseline, current)), 2)
+        self.assertEqual(benchmark.compare(baseline, baseline), [])
+
+    def test_baseline_regression_fails(self):
+        baseline = self.benchmark()
+        for roles in baseline['results'].values():
+            for row in roles.values():
+                row['queries'] = -1
+        path = os.path.join(TEMP_DIR, 'baseline.json')
+        with open(path, 'w') as file:
+            json.dump(baseline, file)
+        with self.assertRaises(CommandError):
+            self.benchmark(f'--baseline={path}')
@@ -0,0 +1,105 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..models import Comment, Follow, Group, Post, User
+
+SLUG = 'test-slug'
+USERNAME = 'Joshua'
+USERNAME2 = 'Jony'
+
+HOME_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME2)
+        cls.group = Group.objects.create(
+            title='Группа', slug=SLUG, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тест текст', author=cls.user, group=cls.group
+        )
+        cls.POST_URL = reverse('posts:post_detail', args=[cls.post.pk])
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user2)
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, client, url):
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified(self):
+        for url in (HOME_URL, GROUP_URL, PROFILE_URL, self.POST_URL):
+            for client in (self.client, self.authorized_client):
+                with self.subTest(url=url, client=client):
+                    response = self.revalidate(client, url)
+                    self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_user(self):
+        self.assertNotEqual(
+            self.client.get(HOME_URL)['ETag'],
+            self.authorized_client.get(HOME_URL)['ETag'],
+        )
+
+    def test_etag_changes_on_login(self):
+        # После повторного входа CSRF-токен в форме комментария другой.
+        client = Client()
+        client.force_login(self.user2)
+        etag = client.get(self.POST_URL)['ETag']
+        client.logout()
+        client.force_login(self.user2)
+        response = client.get(self.POST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_invalidate(self):
+        changes = [
+            (HOME_URL, lambda: Post.objects.create(
+                text='Новый', author=self.user2)),
+            (GROUP_URL, lambda: Post.objects.create(
+                text='Новый', author=self.user2, group=self.group)),
+            (PROFILE_URL, lambda: Follow.objects.create(
+                user=self.user2, author=self.user)),
+            (self.POST_URL, lambda: Comment.objects.create(
+                text='Новый', author=self.user2, post=self.post)),
+        ]
+        for url, change in changes:
+            with self.subTest(url=url):
+                etag = self.authorized_client.get(url)['ETag']
+                change()
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_ignored(self):
+        # Дата не отражает подписок и счётчиков: без Last-Modified
+        # прокси перепроверяет страницу только по ETag.
+        response = self.client.get(PROFILE_URL)
+        self.assertFalse(response.has_header('Last-Modified'))
+        Follow.objects.create(user=self.user2, author=self.user)
+        response = self.client.get(
+            PROFILE_URL, HTTP_IF_MODIFIED_SINCE=http_date()
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_skips_render(self):
+        for url, queries in ((HOME_URL, 0), (self.POST_URL, 1)):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(queries):
+                    self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_missing_page(self):
+        response = self.client.get(
+            reverse('posts:group_list', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
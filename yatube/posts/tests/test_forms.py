@@ -1,10 +1,12 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from ..models import Post, Group, User
 
@@ -104,11 +106,119 @@ class PostFormTests(TestCase):
         self.assertEqual(post.text, form_data['text'])
         self.assertEqual(post.author, self.user)
         self.assertEqual(post.group.id, form_data['group'])
-        self.assertEqual(
+        self.assertRegex(
             post.image.name,
-            f'{ settings.UPLOAD_POST }/{ uploaded.name }'
+            rf'^{ settings.UPLOAD_POST }/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.gif$'
         )
 
+    def test_same_image_stored_once(self):
+        names = set()
+        for name in ['one.gif', 'two.gif']:
+            self.authorized_client.post(CREATE_URL, data={
+                'text': TEXT,
+                'image': SimpleUploadedFile(
+                    name=name,
+                    content=SMALL_GIF,
+                    content_type='image/gif'
+                )
+            })
+            names.add(Post.objects.latest('pub_date').image.name)
+        self.assertEqual(len(names), 1)
+
+    def test_image_normalized(self):
+        image = Image.new('RGB', (4000, 1000), 'red')
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', exif=exif)
+        self.authorized_client.post(CREATE_URL, data={
+            'text': TEXT,
+            'image': SimpleUploadedFile(
+                name='photo.jpg',
+                content=buffer.getvalue(),
+                content_type='image/jpeg'
+            )
+        })
+        post = Post.objects.latest('pub_date')
+        with Image.open(post.image) as saved:
+            self.assertEqual(
+                saved.size,
+                (settings.POST_IMAGE_MAX_SIZE[0], 480)
+            )
+            self.assertFalse(saved.getexif())
+        self.assertEqual(
+            (post.image_width, post.image_height),
+            (settings.POST_IMAGE_MAX_SIZE[0], 480)
+        )
+
+    def test_plain_names_not_overwritten(self):
+        # Загрузки в обход формы сохраняют исходное имя файла.
+        posts = [
+            Post.objects.create(
+                author=self.user,
+                text=TEXT,
+                image=SimpleUploadedFile('photo.gif', content),
+            )
+            for content in [SMALL_GIF, SMALL_GIF + b'\x00']
+        ]
+        self.assertNotEqual(posts[0].image.name, posts[1].image.name)
+        for post, content in zip(posts, [SMALL_GIF, SMALL_GIF + b'\x00']):
+            with post.image.open('rb') as file:
+                self.assertEqual(file.read(), content)
+
+    def test_other_formats_converted(self):
+        for image_format, mode, extension in [
+            ('TIFF', 'CMYK', 'jpg'),
+            ('BMP', 'RGB', 'jpg'),
+            ('TIFF', 'RGBA', 'png'),
+        ]:
+            with self.subTest(image_format=image_format, mode=mode):
+                buffer = BytesIO()
+                Image.new(mode, (3, 2)).save(buffer, image_format)
+                response = self.authorized_client.post(CREATE_URL, data={
+                    'text': TEXT,
+                    'image': SimpleUploadedFile(
+                        name=f'photo.{image_format.lower()}',
+                        content=buffer.getvalue(),
+                    )
+                })
+                self.assertRedirects(response, PROFILE_URL)
+                post = Post.objects.latest('pub_date')
+                self.assertTrue(post.image.name.endswith(f'.{extension}'))
+                with Image.open(post.image) as saved:
+                    self.assertEqual(saved.format, {
+                        'jpg': 'JPEG', 'png': 'PNG'
+                    }[extension])
+
+    def test_mpo_saved_as_jpeg(self):
+        buffer = BytesIO()
+        frames = [Image.new('RGB', (4, 2), color) for color in ['red', 'blue']]
+        frames[0].save(
+            buffer, 'MPO', save_all=True, append_images=frames[1:]
+        )
+        self.authorized_client.post(CREATE_URL, data={
+            'text': TEXT,
+            'image': SimpleUploadedFile('photo.jpg', buffer.getvalue()),
+        })
+        post = Post.objects.latest('pub_date')
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        with Image.open(post.image) as saved:
+            self.assertEqual(saved.format, 'JPEG')
+
+    def test_broken_image_rejected(self):
+        buffer = BytesIO()
+        Image.new('RGB', (200, 200), 'red').save(buffer, 'JPEG')
+        posts_count = Post.objects.count()
+        response = self.authorized_client.post(CREATE_URL, data={
+            'text': TEXT,
+            'image': SimpleUploadedFile(
+                'photo.jpg', buffer.getvalue()[:-100]
+            ),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['image'])
+        self.assertEqual(Post.objects.count(), posts_count)
+
     def test_post_edit(self):
         uploaded = SimpleUploadedFile(
             name='small2.gif',
@@ -130,10 +240,7 @@ class PostFormTests(TestCase):
         self.assertEqual(post.text, form_data['text'])
         self.assertEqual(post.author, self.post.author)
         self.assertEqual(post.group.id, form_data['group'])
-        self.assertEqual(
-            post.image.name,
-            f'{ settings.UPLOAD_POST }/{ uploaded.name }'
-        )
+        self.assertTrue(post.image.name.endswith('.gif'))
 
     def test_anonimys_create_post(self):
         Post.objects.all().delete()
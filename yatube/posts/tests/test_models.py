@@ -1,6 +1,9 @@
-from django.test import TestCase
+from io import StringIO
 
-from ..models import Group, Post, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Group, Post, User
 
 
 class PostsModelTest(TestCase):
@@ -25,3 +28,24 @@ class PostsModelTest(TestCase):
 
     def test_models_have_correct_object_text(self):
         self.assertEqual(self.post.text, self.post.text[:15])
+
+    @override_settings(POST_EXCERPT_LENGTH=10)
+    def test_text_rendered_on_save(self):
+        post = Post.objects.create(
+            author=self.user, text='<b>Первая</b>\nвторая строка'
+        )
+        self.assertEqual(
+            post.text_html, '&lt;b&gt;Первая&lt;/b&gt;<br>вторая строка'
+        )
+        self.assertEqual(post.excerpt, '&lt;b&gt;Первая…')
+        comment = Comment.objects.create(
+            author=self.user, post=post, text='a\nb'
+        )
+        self.assertEqual(comment.text_html, 'a<br>b')
+
+    def test_render_texts_command(self):
+        Post.objects.update(text_html='', excerpt='')
+        call_command('render_texts', stdout=StringIO())
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.text_html, self.post.text)
+        self.assertEqual(post.excerpt, self.post.text)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+
+SLUG = 'test-slug'
+SLUG2 = 'test-slug-2'
+USERNAME = 'Joshua'
+USERNAME2 = 'Jony'
+
+GROUP_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME2)
+        cls.group = Group.objects.create(
+            title='Группа', slug=SLUG, description='Описание'
+        )
+        cls.group2 = Group.objects.create(
+            title='Группа 2', slug=SLUG2, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тест текст', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Первый ответ только заводит версии тегов, второй попадает в кеш.
+        self.client.get(GROUP_URL)
+        self.client.get(PROFILE_URL)
+
+    def test_cached_response(self):
+        for url in (GROUP_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                page = self.client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response.content, page.content)
+                self.assertIn('Age', response)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_authorized_not_cached(self):
+        client = Client()
+        client.force_login(self.user2)
+        response = client.get(GROUP_URL)
+        self.assertNotIn('Age', response)
+
+    def test_post_purges_tagged_pages(self):
+        self.client.get(GROUP_URL)
+        self.client.get(PROFILE_URL)
+        Post.objects.create(text='Новый пост', author=self.user2,
+                            group=self.group)
+        self.assertIn(
+            'Новый пост', self.client.get(GROUP_URL).content.decode()
+        )
+
+    def test_post_in_other_group_keeps_pages(self):
+        self.client.get(GROUP_URL)
+        self.client.get(PROFILE_URL)
+        Post.objects.create(text='Другая группа', author=self.user2,
+                            group=self.group2)
+        for url in (GROUP_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                with self.assertNumQueries(0):
+                    self.client.get(url)
+
+    def test_follow_purges_profile(self):
+        self.client.get(PROFILE_URL)
+        Follow.objects.create(user=self.user2, author=self.user)
+        self.assertIn(
+            'Подписчиков: 1', self.client.get(PROFILE_URL).content.decode()
+        )
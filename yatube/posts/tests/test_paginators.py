@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Group, Post, User
+from ..paginators import CachedCountPaginator, CursorPaginator
+
+ELLIPSIS = CachedCountPaginator.ELLIPSIS
+
+
+class PaginatorsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Joshua')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=str(i)) for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_elided_page_range(self):
+        paginator = CachedCountPaginator(range(200), 10)
+        cases = [
+            [1, [1, 2, 3, ELLIPSIS, 20]],
+            [10, [1, ELLIPSIS, 8, 9, 10, 11, 12, ELLIPSIS, 20]],
+            [20, [1, ELLIPSIS, 18, 19, 20]],
+        ]
+        for number, page_range in cases:
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(paginator.get_elided_page_range(number)),
+                    page_range
+                )
+
+    def test_count_is_cached(self):
+        CursorPaginator(Post.objects.all(), 10, 'test').get_page()
+        with self.assertNumQueries(1):
+            page = CursorPaginator(Post.objects.all(), 10, 'test').get_page()
+        self.assertEqual(page.paginator.num_pages, 3)
+
+    def test_count_reset_on_post_create(self):
+        CursorPaginator(Post.objects.all(), 10, 'index').get_page()
+        Post.objects.create(author=self.user, text='new')
+        paginator = CursorPaginator(Post.objects.all(), 10, 'index')
+        self.assertEqual(paginator.count, 26)
+
+    def test_count_reset_on_group_change(self):
+        group = Group.objects.create(title='group', slug='group')
+        Post.objects.filter(text__in=['1', '2']).update(group=group)
+
+        def count():
+            return CursorPaginator(
+                group.posts.all(), 10, f'group:{group.pk}'
+            ).count
+
+        self.assertEqual(count(), 2)
+        post = group.posts.first()
+        post.group = None
+        post.save()
+        self.assertEqual(count(), 1)
+
+    def test_cursor_keeps_page_number(self):
+        paginator = CursorPaginator(Post.objects.all(), 10, 'test')
+        page = paginator.get_page()
+        page = paginator.get_page(page.next_cursor)
+        self.assertEqual(page.number, 2)
+        self.assertEqual(
+            list(paginator.get_page(number=2)), list(page)
+        )
+        self.assertEqual(paginator.get_page(page.next_cursor).number, 3)
+        self.assertEqual(paginator.get_page(number=100).number, 3)
+
+    def test_last_page_without_offset(self):
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk')[20:]
+        )
+        for number in ['last', 3]:
+            paginator = CursorPaginator(Post.objects.all(), 10)
+            with self.subTest(number=number):
+                with self.assertNumQueries(2) as context:
+                    page = paginator.get_page(number=number)
+                self.assertEqual(page.number, 3)
+                self.assertEqual(list(page), expected)
+                self.assertIsNone(page.next_cursor)
+                self.assertIsNotNone(page.previous_cursor)
+                self.assertNotIn('OFFSET', context.captured_queries[-1]['sql'])
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tests.queries import QueryAssertionsMixin
+from ..models import Comment, Follow, Group, Post, User
+
+USERNAME = 'Joshua'
+FEED_TABLES = ('posts_post', 'posts_comment', 'posts_timelineentry')
+
+
+class PostsQueriesTests(QueryAssertionsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.stranger = User.objects.create_user(username='Stranger')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        # Три страницы в каждой ленте: вторая полная, третья нет.
+        for number in range(settings.POSTS_QUANTITY * 2 + 1):
+            author = User.objects.create_user(username=f'author{number}')
+            group = Group.objects.create(
+                title=f'group{number}',
+                slug=f'group{number}',
+                description='description',
+            )
+            Follow.objects.create(user=cls.user, author=author)
+            cls.post = Post.objects.create(
+                author=author, group=group, text='text'
+            )
+            Comment.objects.create(author=author, post=cls.post, text='text')
+            cls.own_post = Post.objects.create(
+                author=cls.user, group=cls.post.group
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def budgets(self):
+        """(адрес, метод, данные, бюджет гостя, бюджет пользователя).
+
+        Бюджеты — текущее число запросов на холодном кеше: рост любого
+        из них должен быть осознанным и менять эту таблицу.
+        """
+        post = self.post.pk
+        return [
+            (reverse('posts:index'), 'get', {}, 2, 4),
+            (reverse('posts:group_list', args=[self.post.group.slug]),
+             'get', {}, 3, 5),
+            (reverse('posts:profile', args=[USERNAME]), 'get', {}, 4, 7),
+            (reverse('posts:post_detail', args=[post]), 'get', {}, 4, 6),
+            (reverse('posts:post_comments', args=[post]), 'get', {}, 2, 2),
+            (reverse('posts:search'), 'get', {'q': 'text'}, 3, 5),
+            (reverse('posts:follow_index'), 'get', {}, 0, 5),
+            (reverse('posts:post_create'), 'get', {}, 0, 5),
+            (reverse('posts:post_edit', args=[self.own_post.pk]),
+             'get', {}, 0, 5),
+            (reverse('posts:add_comment', args=[post]),
+             'post', {'text': 'comment'}, 0, 4),
+            (reverse('posts:profile_follow', args=['Stranger']),
+             'get', {}, 0, 13),
+            (reverse('posts:profile_unfollow', args=['Stranger']),
+             'get', {}, 0, 9),
+        ]
+
+    def test_query_budgets(self):
+        clients = {'guest': Client(), 'user': self.authorized_client}
+        for url, method, data, *budgets in self.budgets():
+            for (role, client), budget in zip(clients.items(), budgets):
+                cache.clear()
+                with self.subTest(url=url, role=role):
+                    with self.assertMaxQueries(budget):
+                        getattr(client, method)(url, data)
+
+    def test_feed_queries_do_not_grow_with_page(self):
+        # На последней странице постов меньше, чем на полной: разница
+        # в запросах означает N+1 в карточке поста. Страницы берутся
+        # по курсору, как при переходе по ссылке «Следующая».
+        for url in [
+            reverse('posts:index'),
+            reverse('posts:profile', args=[USERNAME]),
+            reverse('posts:follow_index'),
+        ]:
+            pages = []
+            cursor = self.authorized_client.get(url).context[
+                'page_obj'
+            ].next_cursor
+            while cursor:
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.authorized_client.get(
+                        url, {'cursor': cursor}
+                    )
+                page = response.context['page_obj']
+                pages.append((len(page), queries.captured_queries))
+                cursor = page.next_cursor
+            (full, expected), (short, actual) = pages[0], pages[-1]
+            with self.subTest(url=url):
+                self.assertEqual(full, settings.POSTS_QUANTITY)
+                self.assertLess(short, settings.POSTS_QUANTITY)
+                self.assertSameQueries(expected, actual)
+
+    def test_feed_queries_use_indexes(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.post.group.slug]),
+            reverse('posts:profile', args=[USERNAME]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+            reverse('posts:post_comments', args=[self.post.pk]),
+            reverse('posts:follow_index'),
+        ]
+        for url in urls:
+            for params in [{}, {'page': 2}, {'page': 'last'}]:
+                cache.clear()
+                page = self.authorized_client.get(url, params).context.get(
+                    'page_obj'
+                )
+                cursors = [{}]
+                if page is not None and page.next_cursor:
+                    cursors.append({'cursor': page.next_cursor})
+                for cursor in cursors:
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as queries:
+                        self.authorized_client.get(url, cursor or params)
+                    for query in queries:
+                        sql = query['sql']
+                        if 'ORDER BY' not in sql or not any(
+                            f'FROM "{table}"' in sql for table in FEED_TABLES
+                        ):
+                            continue
+                        with self.subTest(url=url, sql=sql):
+                            self.assertIndexedPlan(sql)
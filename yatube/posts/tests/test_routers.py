@@ -21,7 +21,13 @@ class PostsRoutersTests(TestCase):
             ['profile', [USERNAME], f'/profile/{USERNAME}/'],
             ['post_detail', [self.post.pk], f'/posts/{ self.post.pk }/'],
             ['post_edit', [self.post.pk], f'/posts/{ self.post.pk }/edit/'],
+            [
+                'post_comments',
+                [self.post.pk],
+                f'/posts/{ self.post.pk }/comments/'
+            ],
             ['post_create', [], '/create/'],
+            ['search', [], '/search/'],
             ['follow_index', [], '/follow/'],
             ['profile_follow', [USERNAME], f'/profile/{USERNAME}/follow/'],
             ['profile_unfollow', [USERNAME], f'/profile/{USERNAME}/unfollow/']
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+SEARCH_URL = reverse('posts:search')
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Joshua')
+        cls.user2 = User.objects.create_user(username='Jony')
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug='test-slug',
+            description='Тест описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Котики спят на солнце',
+        )
+        cls.post2 = Post.objects.create(
+            author=cls.user2,
+            text='Котики и собаки, котики и снова котики',
+        )
+        cls.guest_client = Client()
+
+    def search(self, **params):
+        return [
+            post.pk for post in
+            self.guest_client.get(SEARCH_URL, params).context['page_obj']
+        ]
+
+    def test_search_ranked(self):
+        ranked = [self.post2.pk, self.post.pk]
+        self.assertEqual(self.search(q='котики'), ranked)
+        self.assertEqual(self.search(q='"котики*)'), ranked)
+        self.assertEqual(self.search(q='солнце'), [self.post.pk])
+
+    def test_search_filters(self):
+        self.assertEqual(
+            self.search(q='котики', group=self.group.slug), [self.post.pk]
+        )
+        self.assertEqual(
+            self.search(q='котики', author=self.user2.username),
+            [self.post2.pk]
+        )
+
+    def test_index_follows_changes(self):
+        self.post.text = 'Собаки гуляют'
+        self.post.save()
+        self.assertEqual(self.search(q='солнце'), [])
+        self.assertEqual(self.search(q='гуляют'), [self.post.pk])
+        Post.objects.filter(pk=self.post2.pk).delete()
+        self.assertEqual(self.search(q='котики'), [])
+
+    def test_rebuild_command(self):
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search(q='солнце'), [self.post.pk])
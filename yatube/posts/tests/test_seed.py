@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from .. import stats
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SIZES = {
+    'users': 30,
+    'groups': 3,
+    'posts': 200,
+    'comments': 300,
+    'follows': 100,
+}
+
+
+def seed(**options):
+    call_command('seed_yatube', stdout=StringIO(), **SIZES, **options)
+
+
+def dataset():
+    return (
+        list(Post.objects.order_by('pk').values_list(
+            'author__username', 'group__slug', 'text', 'image'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'author__username', 'post__text', 'text'
+        )),
+        sorted(Follow.objects.values_list(
+            'user__username', 'author__username'
+        )),
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedCommandTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_counts(self):
+        seed(images=0.5)
+        self.assertEqual(User.objects.count(), SIZES['users'])
+        self.assertEqual(Group.objects.count(), SIZES['groups'])
+        self.assertEqual(Post.objects.count(), SIZES['posts'])
+        self.assertEqual(Comment.objects.count(), SIZES['comments'])
+        self.assertEqual(Follow.objects.count(), SIZES['follows'])
+        self.assertTrue(
+            Post.objects.exclude(image='').filter(
+                image_width__isnull=False
+            ).exists()
+        )
+
+    def test_derived_data(self):
+        seed()
+        self.assertFalse(Post.objects.filter(text_html='').exists())
+        self.assertFalse(Post.objects.filter(excerpt='').exists())
+        self.assertFalse(Comment.objects.filter(text_html='').exists())
+        self.assertEqual(AuthorStats.objects.count(), SIZES['users'])
+        self.assertEqual(stats.reconcile(), (0, 0))
+        comment = Comment.objects.select_related('post').first()
+        self.assertGreaterEqual(comment.created, comment.post.pub_date)
+        follow = Follow.objects.first()
+        self.assertEqual(
+            follow.user.timeline.count(),
+            Post.objects.filter(
+                author__following__user=follow.user
+            ).distinct().count()
+        )
+
+    def test_deterministic(self):
+        seed(seed=7)
+        first = dataset()
+        for model in (Post, Group, User):
+            model.objects.all().delete()
+        seed(seed=7)
+        self.assertEqual(dataset(), first)
+        for model in (Post, Group, User):
+            model.objects.all().delete()
+        seed(seed=8)
+        self.assertNotEqual(dataset(), first)
+
+    def test_prefix_taken(self):
+        User.objects.create_user(username='seed0')
+        with self.assertRaises(CommandError):
+            seed()
@@ -0,0 +1,183 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from .. import thumbnails
+from ..forms import PostForm
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAIL_ASYNC=False)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Joshua')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='text',
+            image_width=2,
+            image_height=1,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def thumbnails_count(self, name=None):
+        return len(default.kvstore._get(
+            ImageFile(name or self.post.image.name).key,
+            identity='thumbnails'
+        ) or [])
+
+    def setUp(self):
+        default.kvstore.delete_thumbnails(ImageFile(self.post.image.name))
+
+    def expected_count(self):
+        # Картинка шириной 2px получает только самую узкую ширину варианта.
+        return (
+            len(settings.POST_IMAGE_RENDITIONS)
+            * len(settings.POST_IMAGE_FORMATS)
+        )
+
+    def test_schedule(self):
+        thumbnails.schedule(self.post.image.name)
+        self.assertEqual(self.thumbnails_count(), self.expected_count())
+
+    def test_pregenerate_command(self):
+        call_command('pregenerate_thumbnails', workers=1, stdout=StringIO())
+        self.assertEqual(self.thumbnails_count(), self.expected_count())
+
+    def test_pregenerate_command_finds_uploaded_images(self):
+        # Имя файла — хеш содержимого: картинка, которой нет в других
+        # тестах, не найдёт готовых миниатюр в хранилище ключей.
+        buffer = BytesIO()
+        Image.new('RGB', (3, 1), (1, 2, 3)).save(buffer, 'GIF')
+        form = PostForm(
+            data={'text': 'text'},
+            files={'image': SimpleUploadedFile(
+                name='upload.gif',
+                content=buffer.getvalue(),
+                content_type='image/gif'
+            )}
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.instance.author = self.user
+        post = form.save()
+        self.assertNotEqual(post.image.name.count('/'), 1)
+        stdout = StringIO()
+        call_command('pregenerate_thumbnails', workers=1, stdout=stdout)
+        self.assertIn('Обработано картинок: 2', stdout.getvalue())
+        self.assertEqual(
+            self.thumbnails_count(post.image.name), self.expected_count()
+        )
+
+    def test_rendition_widths(self):
+        rendition = {'widths': (960, 480, 1440)}
+        self.assertEqual(
+            thumbnails.rendition_widths(rendition), [480, 960, 1440]
+        )
+        self.assertEqual(
+            thumbnails.rendition_widths(rendition, 1000), [480, 960]
+        )
+        self.assertEqual(thumbnails.rendition_widths(rendition, 2), [480])
+
+    def test_picture_tag(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.image_width, post.image_height = 2000, 1000
+        template = Template(
+            "{% load post_images %}{% picture post 'card' 'card-img' %}"
+        )
+        html = template.render(Context({'post': post}))
+        # Вариантов ещё нет: тег их не создаёт и выводит оригинал.
+        self.assertEqual(self.thumbnails_count(), 0)
+        self.assertNotIn('<source', html)
+        self.assertNotIn('srcset', html)
+        self.assertIn(f'src="{post.image.url}"', html)
+        self.assertIn('width="960" height="480"', html)
+        rendition = settings.POST_IMAGE_RENDITIONS['card']
+        for width in rendition['widths']:
+            for image_format in settings.POST_IMAGE_FORMATS:
+                thumbnails.get_rendition(
+                    post.image.name, rendition, width, image_format
+                )
+        html = template.render(Context({'post': post}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('class="card-img"', html)
+        self.assertIn('width="960" height="339"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertEqual(html.count(' 1440w'), 2)
+        self.assertIn('.webp 480w', html)
+        self.assertIn('.jpg 960w', html)
+        self.assertIn(
+            'src="{}"'.format(thumbnails.find_rendition(
+                post.image.name, rendition, 960, 'JPEG'
+            ).url),
+            html
+        )
+
+    def test_generate_refreshes_cached_cards(self):
+        updated = self.post.updated
+        thumbnails.generate(self.post.image.name)
+        self.assertGreater(
+            Post.objects.get(pk=self.post.pk).updated, updated
+        )
+
+    def render_picture(self):
+        return Template('{% load post_images %}{% picture post %}').render(
+            Context({'post': self.post})
+        )
+
+    def test_warm_picture_skips_database(self):
+        thumbnails.schedule(self.post.image.name)
+        cache.clear()
+        before = default.kvstore.stats()
+        with CaptureQueriesContext(connection) as queries:
+            self.render_picture()
+        self.assertEqual(len(queries), 0)
+        after = default.kvstore.stats()
+        self.assertGreater(after['hits'], before['hits'])
+        self.assertEqual(after['misses'], before['misses'])
+
+    def test_evict(self):
+        thumbnails.schedule(self.post.image.name)
+        thumbnails.evict(self.post.image.name)
+        misses = default.kvstore.stats()['misses']
+        self.render_picture()
+        self.assertGreater(default.kvstore.stats()['misses'], misses)
+
+    def test_picture_tag_without_image(self):
+        post = Post(author=self.user, text='text')
+        html = Template('{% load post_images %}{% picture post %}').render(
+            Context({'post': post})
+        )
+        self.assertEqual(html, '')
@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Joshua')
+        cls.author = User.objects.create_user(username='Jony')
+        cls.other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def timeline(self):
+        return list(
+            self.reader.timeline.values_list('post__text', flat=True)
+        )
+
+    def test_fan_out_on_create(self):
+        Post.objects.create(author=self.author, text='author')
+        Post.objects.create(author=self.other, text='other')
+        self.assertEqual(self.timeline(), ['author'])
+
+    def test_follow_and_unfollow(self):
+        Post.objects.create(author=self.other, text='other')
+        follow = Follow.objects.create(user=self.reader, author=self.other)
+        self.assertEqual(self.timeline(), ['other'])
+        follow.delete()
+        self.assertEqual(self.timeline(), [])
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_timeline_length(self):
+        for text in ['1', '2', '3']:
+            Post.objects.create(author=self.author, text=text)
+        self.assertEqual(self.timeline(), ['3', '2'])
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_fan_out_queries_do_not_grow_with_followers(self):
+        def create(text):
+            with CaptureQueriesContext(connection) as queries:
+                Post.objects.create(author=self.author, text=text)
+            return len(queries)
+
+        alone = create('1')
+        for number in range(20):
+            Follow.objects.create(
+                user=User.objects.create_user(f'reader{number}'),
+                author=self.author
+            )
+        self.assertEqual(create('2'), alone)
+        create('3')
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list('post__text', flat=True)),
+            {'3', '2'}
+        )
+
+    def test_count_reset_on_post_delete(self):
+        posts = [
+            Post.objects.create(author=self.author, text=str(number))
+            for number in range(settings.POSTS_QUANTITY * 2 + 1)
+        ]
+        self.client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        self.client.get(url, {'page': 'last'})
+        posts[-1].delete()
+        page = self.client.get(url, {'page': 'last'}).context['page_obj']
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), settings.POSTS_QUANTITY)
+
+    def test_rebuild_command(self):
+        Post.objects.create(author=self.author, text='author')
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.timeline(), ['author'])
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_rebuild_all(self):
+        for text in ['1', '2', '3']:
+            Post.objects.create(author=self.author, text=text)
+        Post.objects.create(author=self.other, text='other')
+        TimelineEntry.objects.all().delete()
+        timeline.rebuild_all()
+        self.assertEqual(self.timeline(), ['3', '2'])
+        self.assertFalse(self.other.timeline.exists())
@@ -1,13 +1,18 @@
 import shutil
 import tempfile
+from io import StringIO
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..models import Follow, Group, Post, User
+from ..feed_cache import feed_version
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -78,6 +83,10 @@ class PostsViewsTests(TestCase):
         super().tearDownClass()
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
+    def setUp(self):
+        # Откат транзакции теста не сбрасывает закешированные карточки.
+        cache.clear()
+
     def test_main_context(self):
         addresses = [
             HOME_URL,
@@ -120,6 +129,50 @@ class PostsViewsTests(TestCase):
                     settings.POSTS_QUANTITY
                 )
 
+    def test_cursor_paginator(self):
+        for post in range(settings.POSTS_QUANTITY * 2):
+            Post.objects.create(author=self.user2, text='text')
+        posts = list(Post.objects.order_by('-pub_date', '-pk'))
+        pages = []
+        page = self.authorized_client.get(PROFILE_URL2).context['page_obj']
+        self.assertIsNone(page.previous_cursor)
+        while True:
+            pages.append(list(page))
+            if not page.next_cursor:
+                break
+            page = self.authorized_client.get(
+                PROFILE_URL2, {'cursor': page.next_cursor}
+            ).context['page_obj']
+        self.assertEqual(sum(pages, []), posts)
+        self.assertEqual(len(pages[-1]), 1)
+        previous = self.authorized_client.get(
+            PROFILE_URL2, {'cursor': page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(previous), pages[-2])
+        self.assertEqual(
+            len(self.authorized_client.get(
+                HOME_URL, {'cursor': 'broken'}
+            ).context['page_obj']),
+            settings.POSTS_QUANTITY
+        )
+
+    def test_comments_pagination(self):
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, text=str(number))
+            for number in range(settings.COMMENTS_QUANTITY + 5)
+        )
+        comments = self.authorized_client.get(
+            self.POST_URL
+        ).context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_QUANTITY)
+        response = self.authorized_client.get(
+            reverse('posts:post_comments', args=[self.post.pk]),
+            {'cursor': comments.next_cursor}
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertEqual(len(response.context['comments']), 5)
+        self.assertIsNone(response.context['comments'].next_cursor)
+
     def test_post_not_in_group(self):
         response = self.authorized_client.get(GROUP_URL2)
         self.assertNotIn(self.post, response.context['page_obj'])
@@ -155,13 +208,100 @@ class PostsViewsTests(TestCase):
             Follow.objects.filter(user=self.user, author=self.user2).exists()
         )
 
+    def test_author_stats(self):
+        Post.objects.create(text='text', author=self.user2)
+        self.authorized_client2.get(reverse(
+            'posts:profile_follow', args=[USERNAME]
+        ))
+        self.authorized_client.get(PROFILE_URL2)
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.authorized_client.get(
+                PROFILE_URL2
+            ).context['stats']
+        self.assertFalse(
+            [query for query in queries if 'COUNT(' in query['sql']]
+        )
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(stats.following_count, 1)
+        self.authorized_client.get(UNFOLLOW_URL)
+        stats.refresh_from_db()
+        self.assertEqual(stats.followers_count, 0)
+        AuthorStats.objects.update(posts_count=0, followers_count=5)
+        call_command('reconcile_author_stats', stdout=StringIO())
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.followers_count, 0)
+
     def test_cache(self):
         page = self.authorized_client.get(HOME_URL).content
-        Post.objects.create(
-            text='text', author=self.user, group=self.group
-        )
+        Post.objects.filter(pk=self.post.pk).update(excerpt='updated')
         self.assertEqual(
             page, self.authorized_client.get(HOME_URL).content)
         cache.clear()
         self.assertNotEqual(
             page, self.authorized_client.get(HOME_URL).content)
+
+    def test_cache_invalidation(self):
+        page = self.authorized_client.get(HOME_URL).content
+        post = Post.objects.create(
+            text='new text', author=self.user, group=self.group
+        )
+        self.assertNotEqual(
+            page, self.authorized_client.get(HOME_URL).content)
+        post.text = 'edited text'
+        post.save()
+        self.assertIn(
+            post.text, self.authorized_client.get(HOME_URL).content.decode()
+        )
+
+    def test_card_cache(self):
+        # Гостю страница группы отдаётся из кеша страниц целиком, поэтому
+        # кеш карточки проверяется на авторизованном пользователе.
+        text = 'Новый текст'
+        self.authorized_client.get(GROUP_URL)
+        Post.objects.filter(pk=self.post.pk).update(text=text, excerpt=text)
+        self.assertNotIn(
+            text, self.authorized_client.get(GROUP_URL).content.decode()
+        )
+        Post.objects.get(pk=self.post.pk).save()
+        self.assertIn(
+            text, self.authorized_client.get(GROUP_URL).content.decode()
+        )
+
+    def test_card_cache_group_renamed(self):
+        self.client.get(PROFILE_URL2)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertIn(
+            group.title, self.client.get(PROFILE_URL2).content.decode()
+        )
+
+    def test_card_cache_author_renamed(self):
+        self.authorized_client.get(GROUP_URL)
+        user = User.objects.get(pk=self.post.author_id)
+        user.username = 'renamed'
+        user.save()
+        self.assertIn(
+            '>renamed<', self.authorized_client.get(GROUP_URL).content.decode()
+        )
+
+    def test_password_change_keeps_caches(self):
+        user = User.objects.get(pk=self.post.author_id)
+        updated = Post.objects.get(pk=self.post.pk).updated
+        version = feed_version()
+        user.set_password('new-password')
+        user.save()
+        self.assertEqual(Post.objects.get(pk=self.post.pk).updated, updated)
+        self.assertEqual(feed_version(), version)
+
+    def test_cache_varies_by_page(self):
+        for post in range(settings.POSTS_QUANTITY):
+            Post.objects.create(author=self.user2, text='text')
+        first = self.authorized_client.get(HOME_URL)
+        second = self.authorized_client.get(
+            HOME_URL, {'cursor': first.context['page_obj'].next_cursor}
+        )
+        self.assertNotEqual(first.content, second.content)
+        self.assertIn(self.post.text, second.content.decode())
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+
+def render(text):
+    """HTML текста: экранирование и переносы строк, как у linebreaksbr."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def excerpt(text):
+    return render(Truncator(text).chars(settings.POST_EXCERPT_LENGTH))
+
+
+def has_excerpt(model):
+    return any(field.name == 'excerpt' for field in model._meta.fields)
+
+
+def fill(instance):
+    """Заполняет готовый HTML поста или комментария перед сохранением."""
+    instance.text_html = render(instance.text)
+    if has_excerpt(type(instance)):
+        instance.excerpt = excerpt(instance.text)
+
+
+def backfill(model, batch_size=1000):
+    """Перерисовывает HTML у всех записей модели, возвращает их число."""
+    fields = ['text_html']
+    if has_excerpt(model):
+        fields.append('excerpt')
+    objects, count = [], 0
+    for instance in model.objects.only('text').iterator(batch_size):
+        fill(instance)
+        objects.append(instance)
+        if len(objects) == batch_size:
+            model.objects.bulk_update(objects, fields)
+            count += len(objects)
+            objects = []
+    model.objects.bulk_update(objects, fields)
+    return count + len(objects)
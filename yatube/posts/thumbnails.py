@@ -0,0 +1,143 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.dispatch import Signal
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+
+# Отправляется, когда generate() создал недостающие варианты картинки.
+renditions_ready = Signal(providing_args=['name'])
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    """Бэкенд sorl, который считает созданные файлы миниатюр."""
+
+    def _create_thumbnail(self, *args, **kwargs):
+        super()._create_thumbnail(*args, **kwargs)
+        metrics.inc('thumbnails_generated')
+
+    def find_thumbnail(self, file_, geometry_string, **options):
+        """Миниатюра из хранилища ключей или None; файл не создаётся.
+
+        Опции дополняются так же, как в get_thumbnail(), чтобы имя
+        миниатюры совпало с созданной им.
+        """
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def _pool():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POST_THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails'
+            )
+            _slots = threading.BoundedSemaphore(
+                settings.POST_THUMBNAIL_QUEUE
+            )
+    return _executor, _slots
+
+
+def rendition_size(rendition, width):
+    ratio_width, ratio_height = rendition['ratio']
+    return width, round(width * ratio_height / ratio_width)
+
+
+def rendition_widths(rendition, source_width=None):
+    """Ширины варианта, которые не больше исходной картинки."""
+    widths = sorted(rendition['widths'])
+    if not source_width:
+        return widths
+    return [width for width in widths if width <= source_width] or widths[:1]
+
+
+def _geometry(rendition, width):
+    return '{}x{}'.format(*rendition_size(rendition, width))
+
+
+def get_rendition(name, rendition, width, image_format):
+    return get_thumbnail(
+        name, _geometry(rendition, width), format=image_format,
+        **rendition['options']
+    )
+
+
+def find_rendition(name, rendition, width, image_format):
+    """Готовый вариант картинки или None, если его ещё не создали."""
+    return default.backend.find_thumbnail(
+        name, _geometry(rendition, width), format=image_format,
+        **rendition['options']
+    )
+
+
+def generate(name):
+    source = default.kvstore.get_or_set(ImageFile(name))
+    created = False
+    for rendition in settings.POST_IMAGE_RENDITIONS.values():
+        for width in rendition_widths(rendition, source.width):
+            for image_format in settings.POST_IMAGE_FORMATS:
+                if find_rendition(name, rendition, width, image_format):
+                    continue
+                get_rendition(name, rendition, width, image_format)
+                created = True
+    if created:
+        renditions_ready.send(sender=None, name=name)
+
+
+def evict(name):
+    """Забывает картинку и её миниатюры в LRU хранилища ключей sorl."""
+    default.kvstore.evict(ImageFile(name))
+
+
+def _run(name, slots):
+    try:
+        generate(name)
+    except Exception:
+        logger.exception('Не удалось подготовить миниатюры для %s', name)
+    finally:
+        slots.release()
+        connection.close()
+
+
+def schedule(name):
+    """Готовит миниатюры картинки поста вне обработки запроса.
+
+    Если очередь пула заполнена, задача отбрасывается: {% picture %}
+    показывает оригинал, пока варианты не подготовит
+    pregenerate_thumbnails.
+    """
+    if not name:
+        return
+    if not settings.POST_THUMBNAIL_ASYNC:
+        generate(name)
+        return
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        logger.warning('Очередь миниатюр заполнена, пропускаем %s', name)
+        return
+    executor.submit(_run, name, slots)
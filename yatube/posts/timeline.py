@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Follow, Post, TimelineEntry, User
+from .paginators import count_cache_key
+
+
+def reset_counts(user_ids):
+    cache.delete_many(
+        [count_cache_key(f'timeline:{user_id}') for user_id in user_ids]
+    )
+
+
+def _entry(user_id, post):
+    return TimelineEntry(
+        user_id=user_id,
+        post=post,
+        author_id=post.author_id,
+        pub_date=post.pub_date,
+    )
+
+
+def trim(readers):
+    """Оставляет читателям по TIMELINE_LENGTH последних записей ленты.
+
+    readers — queryset с одним столбцом id читателей. Лишние записи
+    всех их лент удаляет один DELETE с оконной функцией, сколько бы
+    читателей ни было.
+    """
+    sql, params = readers.query.sql_with_params()
+    table = TimelineEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE id IN ('
+            'SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+            'PARTITION BY user_id ORDER BY pub_date DESC, id DESC'
+            f') AS position FROM {table} WHERE user_id IN ({sql})'
+            ') AS ranked WHERE position > %s)',
+            [*params, settings.TIMELINE_LENGTH]
+        )
+
+
+def fan_out(post):
+    followers = Follow.objects.filter(author_id=post.author_id).values(
+        'user_id'
+    )
+    user_ids = [row['user_id'] for row in followers]
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    trim(followers)
+    reset_counts(user_ids)
+
+
+def add_author(user_id, author_id):
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk'
+    )[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for post in posts],
+        ignore_conflicts=True,
+    )
+    trim(User.objects.filter(pk=user_id).values('pk'))
+    reset_counts([user_id])
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+    reset_counts([user_id])
+
+
+@transaction.atomic
+def rebuild(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    posts = Post.objects.filter(
+        author__following__user_id=user_id
+    ).order_by('-pub_date', '-pk')[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for post in posts]
+    )
+    reset_counts([user_id])
+
+
+@transaction.atomic
+def rebuild_all():
+    """Пересобирает ленты всех пользователей одним INSERT ... SELECT.
+
+    Посты не загружаются в память: последние TIMELINE_LENGTH постов
+    каждого читателя отбирает оконная функция в базе.
+    """
+    readers = set(
+        TimelineEntry.objects.order_by().values_list(
+            'user_id', flat=True
+        ).distinct()
+    )
+    TimelineEntry.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TimelineEntry._meta.db_table} '
+            '(user_id, post_id, author_id, pub_date) '
+            'SELECT user_id, post_id, author_id, pub_date FROM ('
+            'SELECT follow.user_id, post.id AS post_id, post.author_id, '
+            'post.pub_date, ROW_NUMBER() OVER ('
+            'PARTITION BY follow.user_id '
+            'ORDER BY post.pub_date DESC, post.id DESC) AS position '
+            'FROM (SELECT DISTINCT user_id, author_id '
+            f'FROM {Follow._meta.db_table}) AS follow '
+            f'JOIN {Post._meta.db_table} AS post '
+            'ON post.author_id = follow.author_id'
+            ') AS ranked WHERE position <= %s',
+            [settings.TIMELINE_LENGTH]
+        )
+    readers.update(
+        Follow.objects.order_by().values_list('user_id', flat=True).distinct()
+    )
+    reset_counts(readers)
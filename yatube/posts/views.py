@@ -1,51 +1,140 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import get_object_or_404, render, redirect
-
-from .forms import PostForm, CommentForm
+from django.utils.functional import SimpleLazyObject
+
+from core.routers import read_replica
+
+from . import search as post_search
+from . import stats, thumbnails
+from .conditional import (
+    conditional_page, group_state, index_state, post_state, profile_state
+)
+from .page_cache import cache_anonymous_page
+from .feed_cache import feed_version
+from .forms import CommentForm, PostForm, SearchForm
 from .models import Group, Post, User, Follow
+from .paginators import CachedCountPaginator, CursorPaginator
+
+
+def paginator_page(request, post_list, count_key=None):
+    paginator = CursorPaginator(
+        post_list,
+        settings.POSTS_QUANTITY,
+        count_key=count_key
+    )
+    return paginator.get_page(
+        request.GET.get('cursor'),
+        request.GET.get('page')
+    )
 
 
-def paginator_page(request, post_list):
-    paginator = Paginator(post_list, settings.POSTS_QUANTITY)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+def comments_page(request, post):
+    paginator = CursorPaginator(
+        post.comments.for_feed(),
+        settings.COMMENTS_QUANTITY,
+        date_field='created'
+    )
+    return paginator.get_page(request.GET.get('cursor'))
 
 
+@read_replica
+@conditional_page(index_state)
 def index(request):
     return render(request, 'posts/index.html', {
-        'page_obj': paginator_page(request, Post.objects.all())
+        'page_obj': SimpleLazyObject(lambda: paginator_page(
+            request, Post.objects.for_feed(), 'index'
+        )),
+        'feed_version': feed_version(),
+        'cache_timeout': settings.INDEX_CACHE_TIMEOUT,
     })
 
 
+@read_replica
+@cache_anonymous_page
+@conditional_page(group_state)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    return render(request, 'posts/group_list.html', {
+    page = paginator_page(
+        request, group.posts.for_feed(), f'group:{group.pk}'
+    )
+    response = render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': paginator_page(request, group.posts.all())
+        'page_obj': page,
     })
+    response.cache_tags = {f'group:{group.pk}'} | {
+        f'author:{post.author_id}' for post in page
+    }
+    return response
 
 
+@read_replica
+@cache_anonymous_page
+@conditional_page(profile_state)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
+    )
     user = request.user
     following = user.is_authenticated and (
         Follow.objects.filter(user=user, author=author).exists())
-    return render(request, 'posts/profile.html', {
+    page = paginator_page(
+        request, author.posts.for_feed(), f'author:{author.pk}'
+    )
+    response = render(request, 'posts/profile.html', {
         'author': author,
-        'page_obj': paginator_page(request, author.posts.all()),
+        'stats': stats.get(author),
+        'page_obj': page,
         'following': following
     })
+    response.cache_tags = {f'author:{author.pk}'} | {
+        f'group:{post.group_id}' for post in page if post.group_id
+    }
+    return response
+
+
+def search(request):
+    form = SearchForm(request.GET or None)
+    page = None
+    if form.is_valid():
+        posts = Post.objects.for_feed()
+        if form.cleaned_data['group']:
+            posts = posts.filter(group=form.cleaned_data['group'])
+        if form.cleaned_data['author']:
+            posts = posts.filter(author=form.cleaned_data['author'])
+        page = CachedCountPaginator(
+            post_search.filter_posts(posts, form.cleaned_data['q']),
+            settings.POSTS_QUANTITY
+        ).get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+    return render(request, 'posts/search.html', {
+        'form': form,
+        'page_obj': page,
+        'query': query.urlencode(),
+    })
 
 
+@read_replica
+@conditional_page(post_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.for_detail(), pk=post_id)
     form = CommentForm(request.POST or None)
     return render(request, 'posts/post_detail.html', {
         'post': post,
+        'stats': stats.get(post.author),
         'form': form,
-        'comments': post.comments.all(),
+        'comments': comments_page(request, post),
+    })
+
+
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    return render(request, 'posts/includes/comments.html', {
+        'post': post,
+        'comments': comments_page(request, post),
     })
 
 
@@ -62,12 +151,14 @@ def add_comment(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
         return render(request, 'posts/create_post.html', {'form': form})
     form.instance.author = request.user
-    form.save()
+    post = form.save()
+    transaction.on_commit(lambda: thumbnails.schedule(post.image.name))
     return redirect('posts:profile', username=request.user)
 
 
@@ -88,20 +179,35 @@ def post_edit(request, post_id):
             'is_edit': True,
         })
     form.save()
+    if 'image' in form.changed_data:
+        transaction.on_commit(lambda: thumbnails.schedule(post.image.name))
     return redirect('posts:post_detail', post_id=post.id)
 
 
+@read_replica
 @login_required
 def follow_index(request):
-    posts_list = Post.objects.filter(author__following__user=request.user)
+    page = paginator_page(
+        request,
+        request.user.timeline.only('user_id', 'post_id', 'pub_date'),
+        f'timeline:{request.user.pk}'
+    )
+    posts = Post.objects.for_feed().in_bulk(
+        [entry.post_id for entry in page.object_list]
+    )
+    page.object_list = [
+        posts[entry.post_id] for entry in page.object_list
+        if entry.post_id in posts
+    ]
     return render(
         request,
         "posts/follow.html",
-        {'page_obj': paginator_page(request, posts_list)}
+        {'page_obj': page}
     )
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
@@ -110,6 +216,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     get_object_or_404(
         Follow,
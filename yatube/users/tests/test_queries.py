@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tests.queries import QueryAssertionsMixin
+from posts.models import User
+
+USERNAME = 'Joshua'
+PASSWORD = 'Yatube-password-1'
+
+
+class UsersQueriesTests(QueryAssertionsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, password=PASSWORD
+        )
+
+    def clients(self):
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        return {'guest': Client(), 'user': authorized_client}
+
+    def test_query_budgets(self):
+        # (адрес, метод, данные, бюджет гостя, бюджет пользователя)
+        cases = [
+            (reverse('users:signup'), 'get', {}, 0, 2),
+            (reverse('users:signup'), 'post', {
+                'username': 'Newcomer',
+                'email': 'newcomer@yatube.ru',
+                'password1': PASSWORD,
+                'password2': PASSWORD,
+            }, 3, 3),
+            (reverse('users:login'), 'get', {}, 0, 2),
+            (reverse('users:login'), 'post', {
+                'username': USERNAME, 'password': PASSWORD,
+            }, 9, 6),
+            (reverse('users:password_change'), 'get', {}, 0, 2),
+            (reverse('users:password_change_done'), 'get', {}, 0, 2),
+            (reverse('users:logout'), 'get', {}, 0, 4),
+        ]
+        for url, method, data, *budgets in cases:
+            for (role, client), budget in zip(self.clients().items(), budgets):
+                cache.clear()
+                # Каждый запрос видит исходные данные: вход и регистрация
+                # откатываются.
+                with self.subTest(url=url, method=method, role=role), \
+                        transaction.atomic():
+                    with self.assertMaxQueries(budget):
+                        getattr(client, method)(url, data)
+                    transaction.set_rollback(True)
@@ -1,8 +1,19 @@
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# manage.py test и pytest чистят кеш и пишут метрики: их файлы лежат
+# во временном каталоге, а не рядом с файлами работающего сайта.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if TESTING:
+    TEST_FILES_DIR = tempfile.mkdtemp(prefix='yatube-tests-')
+    atexit.register(shutil.rmtree, TEST_FILES_DIR, ignore_errors=True)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
@@ -37,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,6 +89,54 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами, а не открывается на каждый.
+        'CONN_MAX_AGE': 600,
+        # Тесты идут на файле, как в продакшене: база в памяти не
+        # поддерживает WAL и блокирует читателей иначе.
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        },
+    }
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Псевдоним копии базы в DATABASES, из которой читаются ленты; None —
+# всё читается из основной базы. Модели READ_REPLICA_APPS читаются из
+# реплики, а после записи пользователь READ_REPLICA_PIN_SECONDS секунд
+# читает из основной базы. После любой записи столько же читают из
+# основной базы и остальные: иначе кеши заполнились бы из отстающей
+# реплики под новыми версиями.
+READ_REPLICA = None
+READ_REPLICA_APPS = ('posts',)
+READ_REPLICA_PIN_COOKIE = 'pin_primary'
+READ_REPLICA_PIN_SECONDS = 10
+
+# Настройки каждого соединения с SQLite, см. core/db.py. WAL не даёт
+# записи блокировать читателей, synchronous=NORMAL в режиме WAL не
+# теряет целостность при сбое. cache_size в КиБ со знаком минус.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+# Общий для всех воркеров хоста кеш с защитой от одновременного пересчёта.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(
+            TEST_FILES_DIR if TESTING else BASE_DIR, 'cache.sqlite3'
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'STALE_TIMEOUT': 60,
+        },
     }
 }
 
@@ -130,6 +191,63 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_QUANTITY = 10
 
+# Длина анонса поста в лентах, в символах.
+POST_EXCERPT_LENGTH = 500
+
+COMMENTS_QUANTITY = 20
+
+PAGINATOR_COUNT_TIMEOUT = 60 * 5
+
+INDEX_CACHE_TIMEOUT = 60 * 60
+
+# Страницы групп и профилей для гостей: срок в нашем кеше сбрасывается
+# сигналами, браузерам и прокси разрешено хранить ответ минуту.
+PAGE_CACHE_TIMEOUT = 60 * 60
+PAGE_CACHE_MAX_AGE = 60
+
+TIMELINE_LENGTH = 1000
+
 UPLOAD_POST = 'posts'
 
+# Загрузки больше мегабайта пишутся во временный файл, а не в память.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+POST_IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+POST_IMAGE_MAX_SIZE = (1920, 1920)
+POST_IMAGE_QUALITY = 85
+
+# Именованные варианты картинки поста для srcset: ширины, пропорции кадра
+# и опции sorl. Каждая ширина готовится во всех POST_IMAGE_FORMATS,
+# последний формат — запасной для <img>.
+POST_IMAGE_RENDITIONS = {
+    'card': {
+        'widths': (480, 960, 1440),
+        'default': 960,
+        'ratio': (960, 339),
+        'sizes': '(max-width: 960px) 100vw, 960px',
+        'options': {'crop': 'center', 'upscale': True},
+    },
+}
+POST_IMAGE_FORMATS = ('WEBP', 'JPEG')
+
+# Описания миниатюр читаются из LRU процесса, а не из кеша и БД.
+THUMBNAIL_KVSTORE = 'posts.kvstore.KVStore'
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
+THUMBNAIL_LRU_SIZE = 4096
+
+POST_THUMBNAIL_ASYNC = True
+POST_THUMBNAIL_WORKERS = 2
+POST_THUMBNAIL_QUEUE = 64
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Заголовок Server-Timing и гистограммы времени ответа по view.
+SERVER_TIMING = True
+
+# Снимки метрик воркеров для /metrics: каждый процесс пишет свой файл
+# не чаще раза в METRICS_FLUSH_INTERVAL секунд.
+METRICS_DIR = os.path.join(TEST_FILES_DIR if TESTING else BASE_DIR, 'metrics')
+METRICS_FLUSH_INTERVAL = 5
+# Адреса, с которых /metrics открыт без входа: сервер Prometheus должен
+# ходить к приложению напрямую. Адрес обратного прокси сюда не
+# добавляют, иначе метрики увидит любой посетитель.
+METRICS_ALLOWED_IPS = ()